@@ -0,0 +1,79 @@
+"""
+Compare cold pdflatex runs against the warm engine (precompiled format + pre-spawned processes).
+
+    python benchmarks/bench_compile.py [path/to/resume.tex] [--runs N]
+
+Defaults to the sample resume in frontend/src/assets. Needs pdflatex on PATH.
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+
+import django
+django.setup()
+
+from resume.latex_engine import LatexEngine
+from resume.utils import compile_latex_cold
+
+DEFAULT_TEX = os.path.join(BACKEND_DIR, "..", "frontend", "src", "assets", "resume.tex")
+
+
+def timed(func, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        pdf_bytes = func()
+        timings.append(time.perf_counter() - start)
+        if pdf_bytes is None:
+            raise SystemExit("compile failed, see pdflatex output above")
+    return timings
+
+
+def report(name, timings):
+    print(f"{name:>6}: mean {statistics.mean(timings) * 1000:8.1f} ms   "
+          f"median {statistics.median(timings) * 1000:8.1f} ms   "
+          f"min {min(timings) * 1000:8.1f} ms   ({len(timings)} runs)")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("tex", nargs="?", default=DEFAULT_TEX)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    if shutil.which("pdflatex") is None:
+        raise SystemExit("pdflatex is not installed")
+
+    with open(args.tex, encoding="utf-8") as tex_file:
+        latex_content = tex_file.read()
+
+    with tempfile.TemporaryDirectory() as folder:
+        cold = timed(lambda: compile_latex_cold(latex_content, folder), args.runs)
+
+        engine = LatexEngine(fmt_dir=os.path.join(folder, "fmt"), pool_size=2)
+        start = time.perf_counter()
+        engine.warm_up(latex_content)
+        print(f"format dump + pool warm-up: {(time.perf_counter() - start) * 1000:.1f} ms (paid once)")
+        # give the background refill a chance to keep up, as it would between real requests
+        def warm():
+            pdf_bytes = engine.compile(latex_content)
+            time.sleep(0.05)
+            return pdf_bytes
+        warm_timings = [t - 0.05 for t in timed(warm, args.runs)]
+        engine.shutdown()
+
+    report("cold", cold)
+    report("warm", warm_timings)
+    print(f"speed-up: {statistics.median(cold) / statistics.median(warm_timings):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+Concurrent read/write throughput against the API viewsets for each database profile.
+
+    python benchmarks/bench_db.py [--profiles sqlite sqlite-wal postgres] [--readers 8] [--writers 2] [--seconds 5]
+
+Each profile runs in its own process (RESUME_DB_PROFILE is read when settings load) against a
+throwaway database: a temporary SQLite file, or a test database on the POSTGRES_* server.
+Readers list experiences and fetch /api/resume-data/, writers PUT experiences with a new title
+and bullet. Every request is followed by close_old_connections(), as the WSGI handler does, so
+CONN_MAX_AGE and pooling behave as they would in production. The response cache is off so
+reads hit the database. Plain SQLite shows up as "database is locked" errors under writes.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES = ("sqlite", "sqlite-wal", "postgres")
+READ_PATHS = ("/api/experiences/", "/api/resume-data/")
+
+
+def worker(client, stop, counts, write, experience_ids, index):
+    from django.db import close_old_connections, connections
+
+    done = errors = 0
+    latencies = []
+    i = index
+    try:
+        while not stop.is_set():
+            i += 1
+            started = time.perf_counter()
+            try:
+                if write:
+                    experience_id = experience_ids[i % len(experience_ids)]
+                    payload = {"title": f"Engineer {i}", "organisation": "Acme", "descriptions": [{"content": f"bullet {i % 5}"}]}
+                    response = client.put(f"/api/experiences/{experience_id}/", payload, content_type="application/json")
+                else:
+                    response = client.get(READ_PATHS[i % len(READ_PATHS)])
+                ok = response.status_code < 400
+            except Exception:
+                # "database is locked" and friends surface as exceptions from the test client
+                ok = False
+            finally:
+                close_old_connections()
+            latencies.append(time.perf_counter() - started)
+            if ok:
+                done += 1
+            else:
+                errors += 1
+    finally:
+        connections.close_all()
+    counts.append((write, done, errors, latencies))
+
+
+def run_profile(args):
+    """
+    Child process: set up a database for the profile in RESUME_DB_PROFILE and hammer it
+    """
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+    os.environ["RESUME_RESPONSE_CACHE_ENABLED"] = "false"
+    os.environ["RESUME_SERVER_TIMING_ENABLED"] = "false"
+
+    import django
+    django.setup()
+
+    from contextlib import redirect_stdout
+    from io import StringIO
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import setup_test_environment
+    from resume.models import Description, Experience
+
+    setup_test_environment()
+    folder = tempfile.mkdtemp(prefix="bench-db-")
+    if connection.vendor == "sqlite":
+        # WAL needs a file, the default test database would be in memory
+        connection.settings_dict["TEST"]["NAME"] = os.path.join(folder, "bench.sqlite3")
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        descriptions = Description.objects.bulk_create([Description(content=f"bullet {j}") for j in range(3)])
+        experiences = Experience.objects.bulk_create([Experience(title=f"Engineer {i}", organisation="Acme", included=True) for i in range(50)])
+        for experience in experiences:
+            experience.descriptions.add(*descriptions)
+        experience_ids = [experience.id for experience in experiences]
+        connection.close()
+
+        stop = threading.Event()
+        counts = []
+        threads = [
+            threading.Thread(target=worker, args=(Client(), stop, counts, index < args.writers, experience_ids, index))
+            for index in range(args.readers + args.writers)
+        ]
+        # the views print, keep that out of the report
+        with redirect_stdout(StringIO()):
+            for thread in threads:
+                thread.start()
+            time.sleep(args.seconds)
+            stop.set()
+            for thread in threads:
+                thread.join()
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        shutil.rmtree(folder, ignore_errors=True)
+
+    def summary(write):
+        done = sum(c[1] for c in counts if c[0] == write)
+        errors = sum(c[2] for c in counts if c[0] == write)
+        latencies = sorted(latency for c in counts if c[0] == write for latency in c[3])
+        p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+        return {"per_second": done / args.seconds, "errors": errors, "p95_ms": p95 * 1000}
+
+    print(json.dumps({"reads": summary(False), "writes": summary(True)}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", nargs="+", default=["sqlite", "sqlite-wal"], choices=PROFILES)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_profile(args)
+        return
+
+    print(f"{args.readers} readers, {args.writers} writers, {args.seconds:g}s per profile\n")
+    print(f"{'profile':>12} {'reads/s':>10} {'p95 ms':>8} {'errors':>7} {'writes/s':>10} {'p95 ms':>8} {'errors':>7}")
+    for profile in args.profiles:
+        result = subprocess.run(
+            [sys.executable, __file__, "--child", "--readers", str(args.readers), "--writers", str(args.writers), "--seconds", str(args.seconds)],
+            env={**os.environ, "RESUME_DB_PROFILE": profile}, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            print(f"{profile:>12} failed: {result.stderr.strip().splitlines()[-1] if result.stderr.strip() else result.returncode}")
+            continue
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        reads, writes = stats["reads"], stats["writes"]
+        print(f"{profile:>12} {reads['per_second']:10.1f} {reads['p95_ms']:8.1f} {reads['errors']:7d} "
+              f"{writes['per_second']:10.1f} {writes['p95_ms']:8.1f} {writes['errors']:7d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+"""
+Microbenchmarks for the render and serialization hot paths, with saved baselines.
+
+    python benchmarks/bench_suite.py                  # run and compare against benchmarks/baseline.json
+    python benchmarks/bench_suite.py --save           # run and write the baseline
+    python benchmarks/bench_suite.py -k serializer    # only benchmarks whose name contains "serializer"
+
+Runs offline: artifacts go to a MemoryStorage, pdflatex is stubbed out and the database is a
+throwaway test database. Exits with status 1 when a benchmark is slower than its baseline by
+more than --threshold (25% by default) and by more than --noise-floor (0.1 us), and stays
+slower when measured again, so CI can fail on slowdowns. Timings depend on the machine, so save the baseline on the runner that does
+the comparing.
+"""
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from contextlib import redirect_stdout
+from unittest import mock
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "core.settings")
+# keep everything in memory and measure the work itself, not the caches in front of it
+os.environ["RESUME_STORAGE_BACKEND"] = "memory"
+os.environ["RESUME_PDF_CACHE_ENABLED"] = "false"
+os.environ["RESUME_RESPONSE_CACHE_ENABLED"] = "false"
+
+import django
+django.setup()
+
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import setup_test_environment
+from resume.api.serializers import ExperienceSerializer, ProjectSerializer
+from resume.fragments import fragment_cache
+from resume.latex_template import EDUCATION_MARKER, EXPERIENCES_MARKER, PERSONAL_INFO_MARKER, PROJECTS_MARKER, SKILLS_MARKER
+from resume.models import Description, Experience, Project
+from resume.storage import MemoryStorage
+from resume.template_cache import BASE_TEMPLATE_KEY
+from resume.utils import (
+    UPLOAD_SKIP, _escape_str, build_education_latex, build_experiences_latex, build_personal_info_latex,
+    build_projects_latex, build_skills_latex, escape_latex, render_resume_latex, render_resume_pdf,
+)
+
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "benchmarks", "baseline.json")
+SAMPLE_TEX = os.path.join(BACKEND_DIR, "..", "frontend", "src", "assets", "resume.tex")
+FAKE_PDF = b"%PDF-1.5 benchmark"
+
+BULLET = "Cut p95 latency by 40% & saved $12k/month by moving the #1 hot path to a cache_layer {v2}"
+BULLET_COUNTS = (3, 10, 30)
+LIST_SIZES = (10, 100, 1000)
+# benchmarks faster than this are timed with FAST_ROUNDS times as many rounds, their best is noisier
+FAST_BENCHMARK = 1e-6
+FAST_ROUNDS = 4
+
+
+def base_template():
+    """
+    The sample resume's preamble with the template markers in its body
+    """
+    with open(SAMPLE_TEX, encoding="utf-8") as tex_file:
+        preamble = tex_file.read().split("\\begin{document}")[0]
+    return preamble + f"""\\begin{{document}}
+\\begin{{center}}
+{PERSONAL_INFO_MARKER}
+\\end{{center}}
+\\section{{Education}}
+\\resumeSubHeadingListStart
+{EDUCATION_MARKER}
+\\resumeSubHeadingListEnd
+\\section{{Experience}}
+{EXPERIENCES_MARKER}
+\\section{{Projects}}
+{PROJECTS_MARKER}
+\\section{{Technical Skills}}
+\\begin{{itemize}}[leftmargin=0.15in, label={{}}]
+{SKILLS_MARKER}
+\\end{{itemize}}
+\\end{{document}}
+"""
+
+
+def sample_content(rows=6, bullets=4):
+    """
+    Resume content shaped like load_resume_content() output
+    """
+    def descriptions(kind, i):
+        return [{"id": None, "content": f"{BULLET} ({kind} {i}.{j})"} for j in range(bullets)]
+
+    return {
+        "personal_info": {"name": "Jake Ryan", "number": "123-456-7890", "email": "jake@example.com",
+                          "portfolio": "https://example.com", "linkedin": "https://linkedin.com/in/jake", "github": ""},
+        "experiences": [{"id": i, "title": f"Software Engineer {i}", "organisation": "R&D Lab", "location": "Toronto, ON",
+                         "start_date": "May 2023", "end_date": "Present", "included": True,
+                         "descriptions": descriptions("experience", i)} for i in range(rows)],
+        "projects": [{"id": i, "name": f"Project_{i}", "tools": "Python, C#, Django", "source_code": "https://github.com/jake/p",
+                      "included": True, "descriptions": descriptions("project", i)} for i in range(rows)],
+        "education": [{"id": i, "school": f"University {i}", "major": "B.Sc. Computer Science", "location": "Toronto, ON",
+                       "start_date": "Sep 2019", "end_date": "Apr 2023"} for i in range(2)],
+        "skills": [{"id": i, "content": skill} for i, skill in enumerate(["Python", "Django", "React", "PostgreSQL", "AWS", "LaTeX"])],
+    }
+
+
+def measure(func, min_time, repeat):
+    """
+    Seconds per call: the best of `repeat` rounds, each calling func enough times to last min_time
+    """
+    # like timeit, keep collector pauses out of the numbers
+    gc.disable()
+    try:
+        return _measure(func, min_time, repeat)
+    finally:
+        gc.enable()
+
+
+def _measure(func, min_time, repeat):
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 10 if elapsed * 10 < min_time else 2
+
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        rounds.append((time.perf_counter() - start) / number)
+    return min(rounds), statistics.median(rounds)
+
+
+def rolled_back(func):
+    # every call runs in a transaction that is thrown away, so the database stays the same size
+    def call():
+        with transaction.atomic():
+            func()
+            transaction.set_rollback(True)
+    return call
+
+
+def cold(func):
+    # clear the block and escape caches first, as if every row had just been edited
+    def call():
+        fragment_cache.clear()
+        _escape_str.cache_clear()
+        func()
+    return call
+
+
+def latex_benchmarks():
+    content = sample_content()
+    storage = MemoryStorage({BASE_TEMPLATE_KEY: base_template()})
+    sections = {
+        "personal_info": lambda: build_personal_info_latex(content["personal_info"]),
+        "experiences": lambda: build_experiences_latex(content["experiences"]),
+        "education": lambda: build_education_latex(content["education"]),
+        "projects": lambda: build_projects_latex(content["projects"]),
+        "skills": lambda: build_skills_latex(content["skills"]),
+    }
+
+    yield "escape_latex.plain", lambda: escape_latex("Software Engineering Intern")
+    yield "escape_latex.bullet", lambda: escape_latex(BULLET)
+    yield "escape_latex.bullet_cold", lambda: (_escape_str.cache_clear(), escape_latex(BULLET))
+    for name, build in sections.items():
+        yield f"sections.{name}", cold(build)
+        if name in ("experiences", "education", "projects"):
+            yield f"sections.{name}_cached", build
+    yield "template.assemble", cold(lambda: render_resume_latex(content, storage))
+    yield "template.assemble_cached", lambda: render_resume_latex(content, storage)
+    yield "render.pdf_stubbed", cold(lambda: render_resume_pdf(content, storage, upload=UPLOAD_SKIP))
+
+
+def serializer_benchmarks():
+    experience = Experience.objects.create(title="Engineer", organisation="Acme")
+    project = Project.objects.create(name="Resume builder", tools="Django")
+
+    for bullets in BULLET_COUNTS:
+        descriptions = [[{"content": f"{BULLET} {version}.{j}"} for j in range(bullets)] for version in range(2)]
+        for serializer_class, instance, fields in (
+            (ExperienceSerializer, experience, {"title": "Engineer", "organisation": "Acme"}),
+            (ProjectSerializer, project, {"name": "Resume builder", "tools": "Django"}),
+        ):
+            name = serializer_class.__name__
+
+            def create(serializer_class=serializer_class, fields=fields, descriptions=descriptions[0]):
+                serializer = serializer_class(data={**fields, "descriptions": descriptions})
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+
+            # alternate between two bullet lists so every update has a diff to apply
+            versions = iter(range(sys.maxsize))
+            def update(serializer_class=serializer_class, instance=instance, fields=fields, descriptions=descriptions, versions=versions):
+                row = type(instance).objects.prefetch_related("descriptions").get(pk=instance.pk)
+                serializer = serializer_class(row, data={**fields, "descriptions": descriptions[next(versions) % 2]})
+                serializer.is_valid(raise_exception=True)
+                serializer.save()
+
+            yield f"serializer.{name}.create[{bullets}]", rolled_back(create)
+            update()
+            yield f"serializer.{name}.update[{bullets}]", update
+
+
+def list_benchmarks():
+    client = Client()
+    Experience.objects.all().delete()
+    descriptions = Description.objects.bulk_create([Description(content=f"{BULLET} {j}") for j in range(3)])
+    rows = 0
+    for size in LIST_SIZES:
+        new = Experience.objects.bulk_create([
+            Experience(title=f"Engineer {i}", organisation="Acme", location="Toronto", included=i % 2 == 0)
+            for i in range(rows, size)
+        ])
+        Experience.descriptions.through.objects.bulk_create([
+            Experience.descriptions.through(experience_id=experience.id, description_id=description.id)
+            for experience in new for description in descriptions
+        ])
+        rows = size
+        yield f"list.experiences[{size}]", lambda: client.get("/api/experiences/")
+        yield f"list.experiences_stream[{size}]", lambda: b"".join(client.get("/api/experiences/?stream=1").streaming_content)
+
+
+def run(args, names=None):
+    """
+    Run the benchmarks picked by -k (or only the given names) and return {name: {"best", "median"}}
+    """
+    results = {}
+    groups = (latex_benchmarks, serializer_benchmarks, list_benchmarks)
+    with mock.patch("resume.utils.compile_latex_to_pdf", return_value=FAKE_PDF), redirect_stdout(io.StringIO()) as sink:
+        for group in groups:
+            for name, func in group():
+                if (args.k and args.k not in name) or (names is not None and name not in names):
+                    continue
+                best, median = measure(func, args.min_time, args.repeat)
+                if best < FAST_BENCHMARK:
+                    best, median = measure(func, args.min_time, args.repeat * FAST_ROUNDS)
+                results[name] = {"best": best, "median": median}
+                # the pipeline prints as it goes, drop that so the report stays readable
+                sink.seek(0)
+                sink.truncate()
+                print(f"{name:<44} {best * 1e6:12.1f} us", file=sys.__stdout__)
+    return results
+
+
+def slower(result, previous, threshold, noise_floor):
+    # sub-microsecond timings wobble by more than 25% between runs, so a slowdown must also be
+    # bigger than noise_floor seconds in absolute terms
+    return result["best"] / previous["best"] - 1 > threshold and result["best"] - previous["best"] > noise_floor
+
+
+def regressions(results, baseline, threshold, noise_floor):
+    return [name for name, result in results.items()
+            if name in baseline and slower(result, baseline[name], threshold, noise_floor)]
+
+
+def report(results, baseline, threshold, noise_floor):
+    print(f"\n{'benchmark':<44} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            print(f"{name:<44} {'-':>12} {result['best'] * 1e6:10.1f}us      new")
+            continue
+        change = result["best"] / previous["best"] - 1
+        flag = "  SLOWER" if slower(result, previous, threshold, noise_floor) else ""
+        print(f"{name:<44} {previous['best'] * 1e6:10.1f}us {result['best'] * 1e6:10.1f}us {change:+8.0%}{flag}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="write the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown before failing, 0.25 = 25%%")
+    parser.add_argument("--noise-floor", type=float, default=0.1, help="microseconds a slowdown must also exceed to count")
+    parser.add_argument("--retries", type=int, default=2, help="times a slow benchmark is measured again before it counts")
+    parser.add_argument("--min-time", type=float, default=0.1, help="seconds each timing round should last")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-k", help="only run benchmarks whose name contains this")
+    args = parser.parse_args()
+    noise_floor = args.noise_floor / 1e6
+
+    baseline = {}
+    if not args.save:
+        if not os.path.exists(args.baseline):
+            raise SystemExit(f"no baseline at {args.baseline}, run with --save to create one")
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)["benchmarks"]
+
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        results = run(args)
+        # shared CI runners are noisy, so a slowdown has to show up again before it fails the build
+        for _ in range(args.retries):
+            slow = regressions(results, baseline, args.threshold, noise_floor)
+            if not slow:
+                break
+            print(f"\nmeasuring {len(slow)} slow benchmark(s) again")
+            for name, result in run(args, set(slow)).items():
+                if result["best"] < results[name]["best"]:
+                    results[name] = result
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "benchmarks": results},
+                      baseline_file, indent=2, sort_keys=True)
+        print(f"\nbaseline saved to {args.baseline}")
+        return
+
+    report(results, baseline, args.threshold, noise_floor)
+    slow = regressions(results, baseline, args.threshold, noise_floor)
+    if slow:
+        raise SystemExit(f"\n{len(slow)} benchmark(s) slower than the baseline by more than {args.threshold:.0%}: {', '.join(slow)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from rest_framework.routers import DefaultRouter
-from resume.api.urls import education_router, experience_router, project_router, skill_router
+from resume.api.urls import education_router, experience_router, project_router, skill_router, resume_data_router
 from django.urls import path, include
 
 # now we can extend the origin router with our own routers
@@ -17,6 +17,9 @@ router.registry.extend(project_router.registry)
 # skills
 router.registry.extend(skill_router.registry)
 
+# all sections at once
+router.registry.extend(resume_data_router.registry)
+
 urlpatterns = [
     path("", include(router.urls)), # this is the main path, but our path to other sections is called (*)
 ]
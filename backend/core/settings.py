@@ -48,6 +48,8 @@ INSTALLED_APPS = [
 ]
 
 CORS_ALLOWED_ORIGINS = ["http://localhost:5173"]
+# lets the frontend read where a streamed resume PDF is uploaded, and when to retry a shed request
+CORS_EXPOSE_HEADERS = ["X-Resume-Url", "Retry-After"]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
@@ -60,6 +62,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    "resume.timing.ServerTimingMiddleware",
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -85,12 +88,70 @@ WSGI_APPLICATION = 'core.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# RESUME_DB_PROFILE picks the database setup:
+#   sqlite      a plain SQLite file, fine for a single developer
+#   sqlite-wal  SQLite in WAL mode with persistent connections, readers no longer wait on writers
+#               (the pragmas below are applied to every new connection in resume/signals.py)
+#   postgres    PostgreSQL from the POSTGRES_* variables, with persistent connections, or a
+#               psycopg connection pool when RESUME_DB_POOL_SIZE is set (pip install -r requirements-postgres.txt)
+RESUME_DB_PROFILE = os.environ.get("RESUME_DB_PROFILE", "sqlite")
+RESUME_SQLITE_PATH = os.environ.get("RESUME_SQLITE_PATH", BASE_DIR / 'db.sqlite3')
+# seconds a connection is kept open between requests (0 closes it after every request)
+RESUME_DB_CONN_MAX_AGE = int(os.environ.get("RESUME_DB_CONN_MAX_AGE", 60))
+RESUME_DB_POOL_SIZE = int(os.environ.get("RESUME_DB_POOL_SIZE", 0))
+# how long a write waits for the SQLite lock before failing with "database is locked"
+RESUME_SQLITE_BUSY_TIMEOUT = float(os.environ.get("RESUME_SQLITE_BUSY_TIMEOUT", 5))
+RESUME_SQLITE_PRAGMAS = {}
+
+if RESUME_DB_PROFILE == "postgres":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get("POSTGRES_DB", "resume"),
+            'USER': os.environ.get("POSTGRES_USER", "postgres"),
+            'PASSWORD': os.environ.get("POSTGRES_PASSWORD", ""),
+            'HOST': os.environ.get("POSTGRES_HOST", "localhost"),
+            'PORT': os.environ.get("POSTGRES_PORT", "5432"),
+            'CONN_MAX_AGE': RESUME_DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
     }
-}
+    if RESUME_DB_POOL_SIZE:
+        # pooled connections go back to the pool after each request, Django won't combine them with CONN_MAX_AGE
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {"min_size": 1, "max_size": RESUME_DB_POOL_SIZE, "timeout": 10}
+elif RESUME_DB_PROFILE == "sqlite-wal":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': RESUME_SQLITE_PATH,
+            'CONN_MAX_AGE': RESUME_DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'timeout': RESUME_SQLITE_BUSY_TIMEOUT,
+                # take the write lock when a transaction starts, so it waits on busy_timeout
+                # instead of failing when a read transaction tries to upgrade
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+    RESUME_SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        # WAL keeps the database consistent with NORMAL, only the last commits can be lost on power loss
+        "synchronous": "NORMAL",
+        "busy_timeout": int(RESUME_SQLITE_BUSY_TIMEOUT * 1000),
+        "mmap_size": int(os.environ.get("RESUME_SQLITE_MMAP_SIZE", 128 * 1024 * 1024)),
+    }
+elif RESUME_DB_PROFILE == "sqlite":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': RESUME_SQLITE_PATH,
+        }
+    }
+else:
+    raise ValueError(f"Unknown RESUME_DB_PROFILE {RESUME_DB_PROFILE!r}")
 
 AWS_ACCESS_KEY_ID = os.environ.get("AWS_ACCESS_KEY_ID")
 AWS_SECRET_ACCESS_KEY = os.environ.get("AWS_SECRET_ACCESS_KEY")
@@ -98,6 +159,99 @@ AWS_STORAGE_BUCKET_NAME = os.environ.get("AWS_STORAGE_BUCKET_NAME")
 AWS_S3_REGION_NAME = os.environ.get("AWS_S3_REGION_NAME")
 AWS_S3_CUSTOM_DOMAIN = os.environ.get("AWS_S3_CUSTOM_DOMAIN")
 
+# Shared S3 client used by the resume compile functions (see resume/s3.py)
+AWS_S3_MAX_POOL_CONNECTIONS = int(os.environ.get("AWS_S3_MAX_POOL_CONNECTIONS", 10))
+AWS_S3_CONNECT_TIMEOUT = float(os.environ.get("AWS_S3_CONNECT_TIMEOUT", 5))
+AWS_S3_READ_TIMEOUT = float(os.environ.get("AWS_S3_READ_TIMEOUT", 30))
+AWS_S3_TCP_KEEPALIVE = os.environ.get("AWS_S3_TCP_KEEPALIVE", "true").lower() == "true"
+AWS_S3_MAX_RETRIES = int(os.environ.get("AWS_S3_MAX_RETRIES", 3))
+
+# Where templates, rendered .tex files and PDFs live (see resume/storage.py): "s3", "local" or "memory".
+# "local" keeps everything under RESUME_LOCAL_STORAGE_DIR and serves PDFs from RESUME_LOCAL_STORAGE_URL
+# (Django streams them itself; in production point the front-end server at RESUME_LOCAL_STORAGE_DIR instead)
+RESUME_STORAGE_BACKEND = os.environ.get("RESUME_STORAGE_BACKEND", "s3")
+RESUME_STORAGE_BUCKET = os.environ.get("RESUME_STORAGE_BUCKET", "jake-resume-for-me")
+RESUME_LOCAL_STORAGE_DIR = os.environ.get("RESUME_LOCAL_STORAGE_DIR", str(BASE_DIR / "resume-storage"))
+RESUME_LOCAL_STORAGE_URL = os.environ.get("RESUME_LOCAL_STORAGE_URL", "/resume-files/")
+
+# In-memory LaTeX template cache (see resume/template_cache.py), seconds
+LATEX_TEMPLATE_CACHE_TTL = float(os.environ.get("LATEX_TEMPLATE_CACHE_TTL", 300))
+LATEX_TEMPLATE_REVALIDATE_TIMEOUT = float(os.environ.get("LATEX_TEMPLATE_REVALIDATE_TIMEOUT", 1))
+
+# Upload each rendered .tex to latex_templates/renders/ in the background (off by default)
+RESUME_ARCHIVE_TEX = os.environ.get("RESUME_ARCHIVE_TEX", "false").lower() == "true"
+
+# Content-addressed cache of compiled PDFs (see resume/pdf_cache.py)
+RESUME_PDF_CACHE_ENABLED = os.environ.get("RESUME_PDF_CACHE_ENABLED", "true").lower() == "true"
+RESUME_PDF_CACHE_DIR = os.environ.get("RESUME_PDF_CACHE_DIR", "/tmp/resume-pdf-cache")
+RESUME_PDF_CACHE_MAX_BYTES = int(os.environ.get("RESUME_PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+# Background render jobs for POST /create-resume/?mode=async (see resume/jobs.py)
+RESUME_RENDER_WORKERS = int(os.environ.get("RESUME_RENDER_WORKERS", 2))
+RESUME_RENDER_QUEUE_SIZE = int(os.environ.get("RESUME_RENDER_QUEUE_SIZE", 20))
+
+# Worker processes for manage.py render_resumes (see resume/batch.py), defaults to the CPU count
+RESUME_BATCH_WORKERS = int(os.environ.get("RESUME_BATCH_WORKERS", 0)) or os.cpu_count()
+
+# "cold" runs a fresh pdflatex per render, "warm" compiles against a precompiled preamble format
+# with pre-spawned pdflatex processes (see resume/latex_engine.py). Warm is opt-in until it has
+# been run against a real TeX installation
+RESUME_LATEX_ENGINE = os.environ.get("RESUME_LATEX_ENGINE", "cold")
+RESUME_LATEX_FMT_DIR = os.environ.get("RESUME_LATEX_FMT_DIR", "/tmp/resume-latex-fmt")
+RESUME_LATEX_WARM_POOL_SIZE = int(os.environ.get("RESUME_LATEX_WARM_POOL_SIZE", 2))
+
+# Each compile runs in its own directory under this root (defaults to tmpfs at /dev/shm when available)
+# and at most RESUME_MAX_CONCURRENT_COMPILES run at once (defaults to the CPU count), see resume/workspace.py
+RESUME_COMPILE_WORKSPACE_ROOT = os.environ.get("RESUME_COMPILE_WORKSPACE_ROOT")
+RESUME_MAX_CONCURRENT_COMPILES = int(os.environ.get("RESUME_MAX_CONCURRENT_COMPILES", 0)) or os.cpu_count()
+
+# Admission control in front of pdflatex: callers allowed to wait for a compile slot, how long they
+# wait before a 503, and the Retry-After sent with 429/503 responses (see resume/workspace.py)
+RESUME_COMPILE_QUEUE_SIZE = int(os.environ.get("RESUME_COMPILE_QUEUE_SIZE", 16))
+RESUME_COMPILE_QUEUE_TIMEOUT = float(os.environ.get("RESUME_COMPILE_QUEUE_TIMEOUT", 10))
+RESUME_COMPILE_RETRY_AFTER = int(os.environ.get("RESUME_COMPILE_RETRY_AFTER", 5))
+
+# Limits for each pdflatex process (see resume/limits.py): wall-clock and CPU seconds, address space in MB (0 disables)
+RESUME_COMPILE_TIMEOUT = float(os.environ.get("RESUME_COMPILE_TIMEOUT", 30))
+RESUME_COMPILE_CPU_SECONDS = int(os.environ.get("RESUME_COMPILE_CPU_SECONDS", 20))
+RESUME_COMPILE_MEMORY_MB = int(os.environ.get("RESUME_COMPILE_MEMORY_MB", 2048))
+
+# Rendered LaTeX blocks kept per experience/project/education row (see resume/fragments.py)
+RESUME_FRAGMENT_CACHE_SIZE = int(os.environ.get("RESUME_FRAGMENT_CACHE_SIZE", 2048))
+
+# Opt-in list pagination (?page_size= / ?cursor=) and rows serialized per chunk for ?stream=1 lists
+RESUME_API_PAGE_SIZE = int(os.environ.get("RESUME_API_PAGE_SIZE", 100))
+RESUME_API_MAX_PAGE_SIZE = int(os.environ.get("RESUME_API_MAX_PAGE_SIZE", 1000))
+RESUME_API_STREAM_CHUNK_SIZE = int(os.environ.get("RESUME_API_STREAM_CHUNK_SIZE", 200))
+
+# In-process memory cache by default; set RESUME_CACHE_DIR to share cached responses between worker processes
+if os.environ.get("RESUME_CACHE_DIR"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.environ.get("RESUME_CACHE_DIR"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Rendered list responses (see resume/response_cache.py), invalidated by model signals.
+# On by default only with the shared RESUME_CACHE_DIR cache: with the in-process cache a write
+# handled by one worker process leaves the other workers serving their stale copies
+RESUME_RESPONSE_CACHE_ENABLED = os.environ.get("RESUME_RESPONSE_CACHE_ENABLED", "true" if os.environ.get("RESUME_CACHE_DIR") else "false").lower() == "true"
+RESUME_RESPONSE_CACHE_ALIAS = os.environ.get("RESUME_RESPONSE_CACHE_ALIAS", "default")
+RESUME_RESPONSE_CACHE_TIMEOUT = int(os.environ.get("RESUME_RESPONSE_CACHE_TIMEOUT", 3600))
+
+# Render stage timings: a Server-Timing header on each response and aggregates on /metrics (see resume/timing.py)
+RESUME_SERVER_TIMING_ENABLED = os.environ.get("RESUME_SERVER_TIMING_ENABLED", "true").lower() == "true"
+RESUME_METRICS_ENABLED = os.environ.get("RESUME_METRICS_ENABLED", "true").lower() == "true"
+# how many recent timings per stage the p50/p95/p99 are computed from
+RESUME_METRICS_WINDOW = int(os.environ.get("RESUME_METRICS_WINDOW", 1024))
+
 # Default file storage for all file fields (including uploaded files)
 DEFAULT_FILE_STORAGE = 'storages.backends.s3boto3.S3Boto3Storage'
 
@@ -1,8 +1,9 @@
 from django.contrib import admin
-from .models import Education, Experience, Project, Skill, Description
+from .models import Education, Experience, Project, Skill, Description, RenderJob
 
 admin.site.register(Education)
 admin.site.register(Experience)
 admin.site.register(Project)
 admin.site.register(Skill)
 admin.site.register(Description)
+admin.site.register(RenderJob)
@@ -0,0 +1,48 @@
+import json
+from itertools import islice
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class OptionalCursorPagination(CursorPagination):
+    """
+    Cursor pagination ordered by id. It only applies when the client asks for it with
+    ?page_size= or ?cursor=, so existing callers keep getting the whole list
+    """
+    ordering = "id"
+    page_size = getattr(settings, "RESUME_API_PAGE_SIZE", 100)
+    page_size_query_param = "page_size"
+    max_page_size = getattr(settings, "RESUME_API_MAX_PAGE_SIZE", 1000)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.page_size_query_param not in request.query_params and self.cursor_query_param not in request.query_params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
+
+
+class StreamingListMixin:
+    """
+    ?stream=1 on a list endpoint streams the JSON array instead of building it in memory.
+    Rows come from queryset.iterator() and are serialized a chunk at a time (prefetches
+    included), so memory stays flat however large the table is
+    """
+    def list(self, request, *args, **kwargs):
+        if request.query_params.get("stream") not in ("1", "true"):
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset()).order_by("id")
+        return StreamingHttpResponse(self.stream_json(queryset), content_type="application/json")
+
+    def stream_json(self, queryset):
+        chunk_size = getattr(settings, "RESUME_API_STREAM_CHUNK_SIZE", 200)
+        rows = queryset.iterator(chunk_size=chunk_size)
+        yield "["
+        separator = ""
+        while chunk := list(islice(rows, chunk_size)):
+            data = self.get_serializer(chunk, many=True).data
+            # same compact encoding as JSONRenderer, without the surrounding brackets
+            body = json.dumps(data, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))[1:-1]
+            yield separator + body
+            separator = ","
+        yield "]"
@@ -1,5 +1,5 @@
 from rest_framework.serializers import ModelSerializer
-from ..models import Education, Experience, Project, Skill, Description
+from ..models import Education, Experience, Project, Skill, Description, RenderJob
 
 class EducationSerializer(ModelSerializer):
     class Meta:
@@ -18,6 +18,38 @@ class EducationSerializer(ModelSerializer):
 
         return instance
 
+def set_descriptions(instance, descriptions_data):
+    """
+    Point instance.descriptions at the given bullets in a fixed number of queries.
+    Bullets are matched to existing Description rows by content hash in one IN query,
+    missing ones are bulk created, and only the links that changed are added or removed
+    """
+    contents = list(dict.fromkeys(desc["content"] for desc in descriptions_data))
+    wanted = {Description.hash_content(content): content for content in contents}
+
+    # uses the prefetched descriptions when the instance came from a prefetching queryset
+    linked = list(instance.descriptions.all())
+    current = {desc.content_hash: desc for desc in linked if desc.content_hash in wanted}
+    resolved = {content_hash: desc.id for content_hash, desc in current.items() if desc.content == wanted[content_hash]}
+
+    missing = [content_hash for content_hash in wanted if content_hash not in resolved]
+    if missing:
+        # the same text may exist more than once, reuse the oldest row
+        for desc in Description.objects.filter(content_hash__in=missing).order_by("-id"):
+            if desc.content == wanted[desc.content_hash]:
+                resolved[desc.content_hash] = desc.id
+
+        new = [Description(content=wanted[content_hash], content_hash=content_hash) for content_hash in missing if content_hash not in resolved]
+        for desc in Description.objects.bulk_create(new):
+            resolved[desc.content_hash] = desc.id
+
+    wanted_ids = set(resolved.values())
+    current_ids = {desc.id for desc in linked}
+    if current_ids - wanted_ids:
+        instance.descriptions.remove(*(current_ids - wanted_ids))
+    if wanted_ids - current_ids:
+        instance.descriptions.add(*(wanted_ids - current_ids))
+
 # create our model into json format to be sent over the web
 class DescriptionSerializer(ModelSerializer):
     class Meta:
@@ -34,27 +66,19 @@ class ExperienceSerializer(ModelSerializer):
     def create(self, validated_data):
         descriptions_data = validated_data.pop("descriptions", [])
         experience = Experience.objects.create(**validated_data)
-
-        for desc_data in descriptions_data:
-            description = Description.objects.create(**desc_data)
-            experience.descriptions.add(description)
+        set_descriptions(experience, descriptions_data)
 
         return experience
 
     def update(self, instance, validated_data):
-        descriptions_data = validated_data.pop("descriptions", [])
+        descriptions_data = validated_data.pop("descriptions", None)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
 
-        instance.descriptions.clear()
-        for desc in descriptions_data:
-            try:
-                changing_desc = Description.objects.get(content=desc["content"])
-            except Description.DoesNotExist:
-                changing_desc = Description(content=desc["content"])
-                changing_desc.save()
-            instance.descriptions.add(changing_desc)
+        # a partial update without descriptions leaves the bullets alone
+        if descriptions_data is not None:
+            set_descriptions(instance, descriptions_data)
 
         return instance
 
@@ -65,24 +89,32 @@ class ProjectSerializer(ModelSerializer):
         model = Project
         fields = ("id", "name", "tools", "source_code", "descriptions", "included")
     
-    def update(self, instance, validated_data):
+    def create(self, validated_data):
         descriptions_data = validated_data.pop("descriptions", [])
+        project = Project.objects.create(**validated_data)
+        set_descriptions(project, descriptions_data)
+
+        return project
+
+    def update(self, instance, validated_data):
+        descriptions_data = validated_data.pop("descriptions", None)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         instance.save()
 
-        instance.descriptions.clear()
-        for desc in descriptions_data:
-            try:
-                changing_desc = Description.objects.get(content=desc["content"])
-            except Description.DoesNotExist:
-                changing_desc = Description(content=desc["content"])
-                changing_desc.save()
-            instance.descriptions.add(changing_desc)
+        # a partial update without descriptions leaves the bullets alone
+        if descriptions_data is not None:
+            set_descriptions(instance, descriptions_data)
 
         return instance
 
 class SkillSerializer(ModelSerializer):
     class Meta:
         model = Skill
-        fields = ("id", "content")
\ No newline at end of file
+        fields = ("id", "content")
+
+class RenderJobSerializer(ModelSerializer):
+    class Meta:
+        model = RenderJob
+        fields = ("id", "status", "pdf_url", "error", "created_at", "finished_at")
+        read_only_fields = fields
\ No newline at end of file
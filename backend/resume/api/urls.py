@@ -14,3 +14,6 @@ project_router.register(r"projects", ProjectViewSet)
 
 skill_router = DefaultRouter()
 skill_router.register(r"skills", SkillViewSet)
+
+resume_data_router = DefaultRouter()
+resume_data_router.register(r"resume-data", ResumeDataViewSet, basename="resume-data")
@@ -1,14 +1,183 @@
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ModelViewSet, ViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
+import hashlib
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date, parse_http_date_safe
 from ..models import *
 from .serializers import *
+from .pagination import OptionalCursorPagination, StreamingListMixin
+from ..assembly import load_resume_library
+from ..response_cache import response_cache, EDUCATION, EXPERIENCES, PROJECTS, SKILLS
 
 
-class EducationViewSet(ModelViewSet):
+class BulkUpdateMixin:
+    """
+    PATCH <list>/bulk/ with [{"id": 1, "included": true}, ...] updates many rows in one request.
+    Only plain fields are written (one bulk_update in one transaction), relations are left alone
+    """
+    bulk_update_fields = ()
+
+    @action(detail=False, methods=['patch'], url_path='bulk')
+    def bulk_partial_update(self, request):
+        changes = request.data
+        if not isinstance(changes, list) or not all(isinstance(change, dict) and "id" in change for change in changes):
+            return Response({"error": "Expected a list of objects with an id."}, status=status.HTTP_400_BAD_REQUEST)
+
+        model = self.get_queryset().model
+        ids = []
+        invalid = []
+        for change in changes:
+            # "2" must find row 2, "abc" and [1] are the client's mistake rather than a 500
+            try:
+                ids.append(model._meta.pk.to_python(change["id"]))
+            except ValidationError:
+                invalid.append(change["id"])
+        if invalid:
+            return Response({"error": "Invalid id.", "ids": invalid}, status=status.HTTP_400_BAD_REQUEST)
+
+        with transaction.atomic():
+            instances = model.objects.select_for_update().in_bulk(ids)
+            missing = [pk for pk in ids if pk not in instances]
+            if missing:
+                return Response({"error": "Not found.", "ids": missing}, status=status.HTTP_404_NOT_FOUND)
+
+            updated_fields = set()
+            errors = {}
+            for pk, change in zip(ids, changes):
+                fields = {field: value for field, value in change.items() if field in self.bulk_update_fields}
+                serializer = self.get_serializer(instances[pk], data=fields, partial=True)
+                if not serializer.is_valid():
+                    errors[pk] = serializer.errors
+                    continue
+                for field, value in serializer.validated_data.items():
+                    setattr(instances[pk], field, value)
+                    updated_fields.add(field)
+            if errors:
+                return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+            if updated_fields:
+                # bulk_update skips auto_now, stamp the rows so conditional GETs see the change
+                now = timezone.now()
+                for instance in instances.values():
+                    instance.updated_at = now
+                model.objects.bulk_update(instances.values(), sorted(updated_fields | {"updated_at"}))
+                # bulk_update sends no signals either, so drop the cached lists here
+                transaction.on_commit(lambda: response_cache.invalidate(*self.cache_sections))
+
+        serializer = self.get_serializer(self.get_queryset().filter(id__in=ids), many=True)
+        return Response(serializer.data)
+
+def collection_state(queryset, related=()):
+    """
+    Row count and newest updated_at of a queryset (and of its related rows), in one aggregate query.
+    Adding or editing a row moves the timestamp, deleting one changes the count
+    (unlinking or deleting a related row stamps its owner, see resume.signals)
+    """
+    aggregates = {"count": Count("pk", distinct=True), "updated_at": Max("updated_at")}
+    for name in related:
+        aggregates[f"{name}_updated_at"] = Max(f"{name}__updated_at")
+    return queryset.order_by().aggregate(**aggregates)
+
+def collection_validators(states):
+    """
+    ETag and Last-Modified (a unix timestamp, or None) for a list of collection states
+    """
+    digest = hashlib.sha1(repr([sorted(state.items()) for state in states]).encode("utf-8")).hexdigest()
+    stamps = [value for state in states for key, value in state.items() if key != "count" and value is not None]
+    return quote_etag(digest), int(max(stamps).timestamp()) if stamps else None
+
+def conditional_response(request, etag, last_modified, respond):
+    """
+    Answer 304 Not Modified when If-None-Match / If-Modified-Since still match the given
+    validators, otherwise call respond() to build the full response
+    """
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = respond()
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # let browsers keep the body but always revalidate it, so refreshData gets a 304 when nothing changed
+    response["Cache-Control"] = "no-cache"
+    return response
+
+class ResponseCacheMixin:
+    """
+    Serves list responses from response_cache. A hit skips the database and the serializer
+    altogether, and If-None-Match is answered from the stored ETag.
+    cache_sections names the sections the response is built from
+    """
+    cache_sections = ()
+
+    def cached_list(self, request, respond):
+        self._response_cache_key = None
+        if not response_cache.enabled or "stream" in request.query_params or request.accepted_renderer.format != "json":
+            return respond()
+
+        key = response_cache.key(self.cache_sections, request.get_full_path())
+        entry = response_cache.get(key)
+        if entry is None:
+            # stored by finalize_response once the body is rendered
+            self._response_cache_key = key
+            response = respond()
+            response["X-Cache"] = "MISS"
+            return response
+
+        content, etag, last_modified = entry
+        response = conditional_response(request, etag, last_modified, lambda: HttpResponse(content, content_type="application/json"))
+        response["X-Cache"] = "HIT"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_list(request, lambda: super(ResponseCacheMixin, self).list(request, *args, **kwargs))
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        key = getattr(self, "_response_cache_key", None)
+        if key and response.status_code == 200 and isinstance(response, Response):
+            response.render()
+            response_cache.set(key, (response.content, response["ETag"], parse_http_date_safe(response.get("Last-Modified", ""))))
+        return response
+
+class ConditionalGetMixin:
+    """
+    list and retrieve send ETag / Last-Modified and answer 304 without serializing when unchanged.
+    conditional_related names relations whose rows are nested in the response (e.g. descriptions)
+    """
+    conditional_related = ()
+
+    def list(self, request, *args, **kwargs):
+        state = collection_state(self.filter_queryset(self.get_queryset()), self.conditional_related)
+        # ETag only: a deleted row just lowers the count, If-Modified-Since would never see it
+        etag, _ = collection_validators([state])
+        return conditional_response(request, etag, None, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            queryset = self.get_queryset().filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            state = collection_state(queryset, self.conditional_related)
+        except (TypeError, ValueError, ValidationError):
+            # a malformed pk (/api/experiences/abc/), get_object() turns it into a 404
+            return super().retrieve(request, *args, **kwargs)
+        if not state["count"]:
+            # let the normal path answer 404
+            return super().retrieve(request, *args, **kwargs)
+        etag, last_modified = collection_validators([state])
+        return conditional_response(request, etag, last_modified, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs))
+
+class EducationViewSet(ResponseCacheMixin, ConditionalGetMixin, StreamingListMixin, ModelViewSet):
     queryset = Education.objects.all()
     serializer_class = EducationSerializer
+    cache_sections = (EDUCATION,)
+    pagination_class = OptionalCursorPagination
 
     # details=True allows us to have <pk:id> in the url, and it only selects one element. And this action is only available to the methods delete 
     @action(detail=True, methods=['delete'], url_path='delete')
@@ -20,9 +189,14 @@ class EducationViewSet(ModelViewSet):
         except Experience.DoesNotExist:
             return Response({"error": "Experience not found."}, status=status.HTTP_404_NOT_FOUND)
 
-class ExperienceViewSet(ModelViewSet):
-    queryset = Experience.objects.all()
+class ExperienceViewSet(ResponseCacheMixin, ConditionalGetMixin, StreamingListMixin, BulkUpdateMixin, ModelViewSet):
+    # descriptions are nested in every row, load them in one query instead of one per experience
+    queryset = Experience.objects.prefetch_related("descriptions")
     serializer_class = ExperienceSerializer
+    pagination_class = OptionalCursorPagination
+    conditional_related = ("descriptions",)
+    bulk_update_fields = ("title", "organisation", "location", "start_date", "end_date", "included")
+    cache_sections = (EXPERIENCES,)
 
     @action(detail=True, methods=['delete'], url_path='delete')
     def custom_delete(self, request, pk=None):
@@ -46,9 +220,13 @@ class ExperienceViewSet(ModelViewSet):
             print(serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class ProjectViewSet(ModelViewSet):
-    queryset = Project.objects.all()
+class ProjectViewSet(ResponseCacheMixin, ConditionalGetMixin, StreamingListMixin, BulkUpdateMixin, ModelViewSet):
+    queryset = Project.objects.prefetch_related("descriptions")
     serializer_class = ProjectSerializer
+    pagination_class = OptionalCursorPagination
+    conditional_related = ("descriptions",)
+    bulk_update_fields = ("name", "tools", "source_code", "included")
+    cache_sections = (PROJECTS,)
 
     @action(detail=True, methods=['delete'], url_path='delete')
     def custom_delete(self, request, pk=None):
@@ -72,9 +250,11 @@ class ProjectViewSet(ModelViewSet):
             print(serializer.errors)
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class SkillViewSet(ModelViewSet):
+class SkillViewSet(ResponseCacheMixin, ConditionalGetMixin, StreamingListMixin, ModelViewSet):
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
+    cache_sections = (SKILLS,)
+    pagination_class = OptionalCursorPagination
 
     @action(detail=True, methods=['delete'], url_path='delete')
     def custom_delete(self, request, pk=None):
@@ -84,5 +264,21 @@ class SkillViewSet(ModelViewSet):
             return Response({"message": "Experience deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
         except Experience.DoesNotExist:
             return Response({"error": "Experience not found."}, status=status.HTTP_404_NOT_FOUND)
-        
 
+
+class ResumeDataViewSet(ResponseCacheMixin, ViewSet):
+    # all four sections in one response, so the page loads with a single round trip
+    cache_sections = (EDUCATION, EXPERIENCES, PROJECTS, SKILLS)
+
+    def list(self, request):
+        return self.cached_list(request, lambda: self.library_response(request))
+
+    def library_response(self, request):
+        # ETag only, as for the section lists
+        etag, _ = collection_validators([
+            collection_state(Education.objects.all()),
+            collection_state(Experience.objects.all(), ("descriptions",)),
+            collection_state(Project.objects.all(), ("descriptions",)),
+            collection_state(Skill.objects.all()),
+        ])
+        return conditional_response(request, etag, None, lambda: Response(load_resume_library()))
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ResumeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'resume'
+
+    def ready(self):
+        # connects the fragment and response cache invalidation receivers
+        from . import signals
@@ -0,0 +1,34 @@
+from .models import Education, Experience, Project, Skill
+from .api.serializers import EducationSerializer, ExperienceSerializer, ProjectSerializer, SkillSerializer
+
+
+def load_resume_content(personal_info):
+    """
+    Build the compile_data_to_latex payload from the database instead of the request body.
+
+    Only included experiences and projects are loaded, and their descriptions come from one
+    prefetch query each, so this always runs six queries however large the library is.
+    """
+    experiences = Experience.objects.filter(included=True).prefetch_related("descriptions")
+    projects = Project.objects.filter(included=True).prefetch_related("descriptions")
+
+    return {
+        "personal_info": personal_info,
+        "education": EducationSerializer(Education.objects.all(), many=True).data,
+        "experiences": ExperienceSerializer(experiences, many=True).data,
+        "projects": ProjectSerializer(projects, many=True).data,
+        "skills": SkillSerializer(Skill.objects.all(), many=True).data,
+    }
+
+
+def load_resume_library():
+    """
+    Every education, experience, project and skill row, as the list endpoints would return them.
+    Descriptions are prefetched, so this is six queries however many rows exist
+    """
+    return {
+        "education": EducationSerializer(Education.objects.all(), many=True).data,
+        "experiences": ExperienceSerializer(Experience.objects.prefetch_related("descriptions"), many=True).data,
+        "projects": ProjectSerializer(Project.objects.prefetch_related("descriptions"), many=True).data,
+        "skills": SkillSerializer(Skill.objects.all(), many=True).data,
+    }
@@ -0,0 +1,190 @@
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from django.conf import settings
+from django.utils.text import slugify
+from .assembly import load_resume_library
+from .pdf_cache import pdf_cache
+from .storage import StorageError, get_storage
+from .utils import render_resume_latex
+from .batch_worker import init_worker, compile_variant
+
+BATCH_OUTPUT_FOLDER = "media-resume/batch"
+
+
+class ManifestError(ValueError):
+    pass
+
+
+class VariantResult:
+    """
+    Outcome of one rendered variant: where the PDF went and how long each step took
+    """
+    def __init__(self, name):
+        self.name = name
+        self.location = None
+        self.error = None
+        self.cached = False
+        self.assemble_seconds = 0.0
+        self.compile_seconds = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    @property
+    def seconds(self):
+        return self.assemble_seconds + self.compile_seconds
+
+
+class BatchResult:
+    def __init__(self, results, seconds):
+        self.results = results
+        self.seconds = seconds
+
+    @property
+    def succeeded(self):
+        return [result for result in self.results if result.ok]
+
+    @property
+    def throughput(self):
+        """
+        Rendered variants per second of wall-clock time
+        """
+        return len(self.succeeded) / self.seconds if self.seconds else 0.0
+
+
+def load_manifest(path):
+    """
+    Read a manifest: either a list of variants, or {"personal_info": {...}, "variants": [...]}
+    where the top-level personal_info is the default for every variant.
+
+    A variant has a "name" and may set "personal_info" (merged over the default) and lists of
+    "experiences", "projects", "education" and "skills" ids. Omitted lists keep the library as it
+    is (experiences and projects by their included flag, every education and skill row)
+    """
+    with open(path, encoding="utf-8") as manifest_file:
+        manifest = json.load(manifest_file)
+    if isinstance(manifest, list):
+        manifest = {"variants": manifest}
+    defaults = manifest.get("personal_info", {})
+
+    variants = []
+    names = set()
+    for variant in manifest.get("variants", []):
+        name = slugify(variant.get("name", ""))
+        if not name:
+            raise ManifestError(f"Variant without a usable name: {variant}")
+        if name in names:
+            raise ManifestError(f"Variant name {name} is used twice")
+        names.add(name)
+        variants.append({**variant, "name": name, "personal_info": {**defaults, **variant.get("personal_info", {})}})
+    return variants
+
+
+def variant_content(library, variant):
+    """
+    Resume content for one variant, picked out of a library snapshot from load_resume_library()
+    """
+    def pick(section, flag_included):
+        rows = library[section]
+        ids = variant.get(section)
+        if ids is None:
+            return rows
+        ids = set(ids)
+        if flag_included:
+            return [{**row, "included": row["id"] in ids} for row in rows]
+        return [row for row in rows if row["id"] in ids]
+
+    return {
+        "personal_info": variant.get("personal_info", {}),
+        "experiences": pick("experiences", True),
+        "projects": pick("projects", True),
+        "education": pick("education", False),
+        "skills": pick("skills", False),
+    }
+
+
+def _save(result, pdf_bytes, output_dir, storage):
+    try:
+        if output_dir:
+            path = os.path.join(output_dir, f"{result.name}.pdf")
+            with open(path, "wb") as pdf_file:
+                pdf_file.write(pdf_bytes)
+            result.location = path
+        else:
+            result.location = storage.put_pdf(f"{BATCH_OUTPUT_FOLDER}/{result.name}.pdf", pdf_bytes)
+    except (OSError, StorageError) as e:
+        result.error = f"Could not save PDF: {e}"
+
+
+def render_variants(variants, output_dir=None, storage=None, workers=None, library=None):
+    """
+    Render many resume variants in one go and return a BatchResult.
+
+    The library is read from the database once and every variant is assembled from that
+    snapshot in this process, so the template is loaded once and rows repeated across
+    variants reuse their cached LaTeX blocks. Only pdflatex runs in the worker processes.
+    PDFs are written to output_dir as <name>.pdf, or to the artifact storage under
+    media-resume/batch/ when no directory is given
+    """
+    started = time.perf_counter()
+    storage = storage or get_storage()
+    library = library if library is not None else load_resume_library()
+    workers = workers or getattr(settings, "RESUME_BATCH_WORKERS", None) or os.cpu_count()
+    use_cache = getattr(settings, "RESUME_PDF_CACHE_ENABLED", True)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    results = {}
+    outputs = {}
+    # digest -> (latex_content, names), variants that come out identical are compiled once
+    pending = {}
+    for variant in variants:
+        result = results[variant["name"]] = VariantResult(variant["name"])
+        assemble_started = time.perf_counter()
+        rendered = render_resume_latex(variant_content(library, variant), storage)
+        result.assemble_seconds = time.perf_counter() - assemble_started
+        if rendered is None:
+            result.error = "Could not fill the base template."
+            continue
+
+        latex_content, template_version = rendered
+        digest = pdf_cache.digest(latex_content, template_version)
+        cached = pdf_cache.get_local(digest) if use_cache else None
+        if cached is not None:
+            result.cached = True
+            outputs[variant["name"]] = cached
+        else:
+            pending.setdefault(digest, (latex_content, []))[1].append(variant["name"])
+
+    if pending:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending)), mp_context=context, initializer=init_worker) as executor:
+            futures = {digest: executor.submit(compile_variant, latex_content) for digest, (latex_content, _) in pending.items()}
+            for digest, future in futures.items():
+                names = pending[digest][1]
+                try:
+                    pdf_bytes, seconds = future.result()
+                except Exception as e:
+                    pdf_bytes, seconds = None, 0.0
+                    error = f"Batch worker crashed: {e}"
+                else:
+                    error = "pdflatex failed."
+                for name in names:
+                    results[name].compile_seconds = seconds
+                    results[name].cached = name != names[0]
+                    if pdf_bytes is None:
+                        results[name].error = error
+                    else:
+                        outputs[name] = pdf_bytes
+                if pdf_bytes is not None and use_cache:
+                    pdf_cache.put_local(digest, pdf_bytes)
+
+    # storage writes are network bound for S3, so they go out together
+    with ThreadPoolExecutor(max_workers=8, thread_name_prefix="resume-batch-save") as executor:
+        list(executor.map(lambda name: _save(results[name], outputs[name], output_dir, storage), outputs))
+
+    return BatchResult(list(results.values()), time.perf_counter() - started)
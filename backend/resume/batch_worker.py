@@ -0,0 +1,17 @@
+import time
+
+# Entry points for the render_resumes worker processes. Spawned workers unpickle these before
+# Django is set up, so this module must not import models (or anything that does) at the top.
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def compile_variant(latex_content):
+    from .utils import compile_latex_to_pdf
+
+    started = time.perf_counter()
+    pdf_bytes = compile_latex_to_pdf(latex_content)
+    return pdf_bytes, time.perf_counter() - started
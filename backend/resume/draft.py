@@ -0,0 +1,226 @@
+import zlib
+from functools import lru_cache
+from .utils import description_texts
+
+# US letter, in points, with the half-inch margins the LaTeX template uses
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+MARGIN = 36
+
+# the PDF base-14 Times faces, close enough to Computer Modern for a layout preview
+FONTS = {
+    "regular": ("F1", "Times-Roman"),
+    "bold": ("F2", "Times-Bold"),
+    "italic": ("F3", "Times-Italic"),
+}
+
+NARROW = set("iljtfI.,;:'!|()[]")
+WIDE = set("mwMW")
+
+
+def char_width(char):
+    """
+    Rough Times glyph width in 1/1000 em. Only used to wrap and right-align, so it need not be exact
+    """
+    if char == " ":
+        return 250
+    if char in NARROW:
+        return 280
+    if char in WIDE:
+        return 800
+    if char.isupper():
+        return 690
+    if char.isdigit():
+        return 500
+    return 470
+
+
+CHAR_WIDTHS = {chr(code): char_width(chr(code)) for code in range(32, 127)}
+
+
+@lru_cache(maxsize=8192)
+def _text_units(text):
+    # words repeat a lot across bullets, so each one is measured once
+    return sum([CHAR_WIDTHS.get(char) or char_width(char) for char in text])
+
+
+def text_width(text, size):
+    return _text_units(text) * size / 1000
+
+
+def wrap(text, size, width):
+    """
+    Greedy word wrap to lines no wider than width points
+    """
+    space = text_width(" ", size)
+    lines = []
+    line = []
+    line_width = 0
+    for word in text.split():
+        word_width = text_width(word, size)
+        if line and line_width + space + word_width > width:
+            lines.append(" ".join(line))
+            line = []
+            line_width = 0
+        line_width += word_width + (space if line else 0)
+        line.append(word)
+    if line:
+        lines.append(" ".join(line))
+    return lines
+
+
+def pdf_string(text):
+    # WinAnsi covers Latin-1 plus smart quotes and dashes, anything else becomes "?"
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return "(" + escaped.encode("cp1252", errors="replace").decode("latin-1") + ")"
+
+
+class DraftPdf:
+    """
+    Minimal top-to-bottom PDF writer: text in the standard Times fonts, horizontal rules,
+    automatic page breaks
+    """
+    def __init__(self):
+        self.pages = [[]]
+        self.y = PAGE_HEIGHT - MARGIN
+
+    def ensure(self, height):
+        if self.y - height < MARGIN:
+            self.pages.append([])
+            self.y = PAGE_HEIGHT - MARGIN
+
+    def text(self, x, text, style="regular", size=10):
+        font = FONTS[style][0]
+        self.pages[-1].append(f"BT /{font} {size} Tf {x:.2f} {self.y:.2f} Td {pdf_string(text)} Tj ET")
+
+    def line(self, size, left="", right="", left_style="regular", right_style="regular", center=False):
+        """
+        One line of text, optionally centered, with an optional right-aligned part
+        """
+        self.ensure(size * 1.25)
+        self.y -= size
+        if center:
+            self.text((PAGE_WIDTH - text_width(left, size)) / 2, left, left_style, size)
+        elif left:
+            self.text(MARGIN, left, left_style, size)
+        if right:
+            self.text(PAGE_WIDTH - MARGIN - text_width(right, size), right, right_style, size)
+        self.y -= size * 0.25
+
+    def paragraph(self, text, size=10, indent=0, bullet=None):
+        width = PAGE_WIDTH - 2 * MARGIN - indent
+        for i, row in enumerate(wrap(text, size, width)):
+            self.ensure(size * 1.25)
+            self.y -= size
+            if bullet and i == 0:
+                self.text(MARGIN + indent - size, bullet, "regular", size)
+            self.text(MARGIN + indent, row, "regular", size)
+            self.y -= size * 0.25
+
+    def rule(self):
+        self.y -= 2
+        self.pages[-1].append(f"0.5 w {MARGIN} {self.y:.2f} m {PAGE_WIDTH - MARGIN} {self.y:.2f} l S")
+        self.y -= 4
+
+    def space(self, points):
+        self.y -= points
+
+    def to_bytes(self):
+        objects = [
+            "<< /Type /Catalog /Pages 2 0 R >>",
+            None,  # page tree, filled in once the page object numbers are known
+        ]
+        font_refs = []
+        for name, base_font in FONTS.values():
+            objects.append(f"<< /Type /Font /Subtype /Type1 /BaseFont /{base_font} /Encoding /WinAnsiEncoding >>")
+            font_refs.append(f"/{name} {len(objects)} 0 R")
+
+        page_refs = []
+        for operations in self.pages:
+            stream = zlib.compress("\n".join(operations).encode("latin-1"))
+            objects.append((f"<< /Length {len(stream)} /Filter /FlateDecode >>\nstream\n".encode("latin-1"), stream))
+            content_ref = len(objects)
+            objects.append(
+                f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                f"/Resources << /Font << {' '.join(font_refs)} >> >> /Contents {content_ref} 0 R >>"
+            )
+            page_refs.append(f"{len(objects)} 0 R")
+        objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(page_refs)} >>"
+
+        out = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += f"{number} 0 obj\n".encode("latin-1")
+            if isinstance(body, tuple):
+                out += body[0] + body[1] + b"\nendstream"
+            else:
+                out += body.encode("latin-1")
+            out += b"\nendobj\n"
+
+        xref = len(out)
+        out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+        out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode("latin-1")
+        out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+        return bytes(out)
+
+
+def date_range(start_date, end_date):
+    return " – ".join(date for date in (start_date, end_date) if date)
+
+
+def render_draft_pdf(content):
+    """
+    Lay out the same content compile_data_to_latex takes as an approximate PDF, in pure Python.
+    Meant for instant previews while editing: no template, no pdflatex, no storage
+    """
+    pdf = DraftPdf()
+
+    personal_info = content.get("personal_info") or {}
+    # null or numeric values (a phone number sent as a number) are fine, as in the LaTeX path
+    pdf.line(22, str(personal_info.get("name") or ""), left_style="bold", center=True)
+    contact = [str(personal_info.get("number") or ""), str(personal_info.get("email") or "")]
+    contact += [label for label, field in (("Portfolio", "portfolio"), ("LinkedIn", "linkedin"), ("Github", "github")) if personal_info.get(field)]
+    pdf.line(10, " | ".join(part for part in contact if part), center=True)
+
+    def section(title):
+        pdf.space(6)
+        pdf.ensure(30)
+        pdf.line(12, title.upper(), left_style="bold")
+        pdf.rule()
+
+    def bullets(descriptions):
+        for text in description_texts(descriptions):
+            pdf.paragraph(text, size=9.5, indent=18, bullet="•")
+        pdf.space(3)
+
+    education = content.get("education", [])
+    if education:
+        section("Education")
+        for entry in education:
+            pdf.line(10.5, entry.get("school") or "", entry.get("location") or "", left_style="bold")
+            pdf.line(9.5, entry.get("major") or "", date_range(entry.get("start_date"), entry.get("end_date")), left_style="italic", right_style="italic")
+            pdf.space(3)
+
+    experiences = [experience for experience in content.get("experiences", []) if experience.get("included")]
+    if experiences:
+        section("Experience")
+        for experience in experiences:
+            pdf.line(10.5, experience.get("title") or "", date_range(experience.get("start_date"), experience.get("end_date")), left_style="bold")
+            pdf.line(9.5, experience.get("organisation") or "", experience.get("location") or "", left_style="italic", right_style="italic")
+            bullets(experience.get("descriptions", []))
+
+    projects = [project for project in content.get("projects", []) if project.get("included")]
+    if projects:
+        section("Projects")
+        for project in projects:
+            heading = " | ".join(part for part in (project.get("name"), project.get("tools")) if part)
+            pdf.line(10.5, heading, "Source Code" if project.get("source_code") else "", left_style="bold", right_style="italic")
+            bullets(project.get("descriptions", []))
+
+    skills = content.get("skills", [])
+    if skills:
+        section("Technical Skills")
+        pdf.paragraph(", ".join(skill["content"] for skill in skills))
+
+    return pdf.to_bytes()
@@ -0,0 +1,72 @@
+import threading
+from collections import OrderedDict
+from django.conf import settings
+
+EXPERIENCE = "resume.experience"
+PROJECT = "resume.project"
+EDUCATION = "resume.education"
+
+
+class FragmentCache:
+    """
+    LRU cache of rendered LaTeX blocks, one per (model, primary key).
+
+    Each entry remembers the row version it was rendered from: a tuple of the field values
+    that feed the block. A render reuses the block only when the version matches, so only
+    rows that changed are escaped and formatted again. Model signals (see signals.py) drop
+    a row's entry as soon as it is saved, deleted or its descriptions change.
+    """
+    def __init__(self, max_entries=None):
+        self._max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_entries(self):
+        if self._max_entries is not None:
+            return self._max_entries
+        return getattr(settings, "RESUME_FRAGMENT_CACHE_SIZE", 2048)
+
+    def render(self, model_label, pk, version, render_func):
+        """
+        Return the cached block for this row version, or call render_func() and cache it
+        """
+        if pk is None:
+            return render_func()
+
+        key = (model_label, pk)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        fragment = render_func()
+        with self._lock:
+            self._entries[key] = (version, fragment)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return fragment
+
+    def invalidate(self, model_label, pk):
+        with self._lock:
+            self._entries.pop((model_label, pk), None)
+
+    def invalidate_model(self, model_label):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == model_label]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+fragment_cache = FragmentCache()
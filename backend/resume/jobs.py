@@ -0,0 +1,77 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils import timezone
+from .models import RenderJob
+from .utils import compile_data_to_latex
+
+_lock = threading.Lock()
+_executor = None
+_pending = 0
+
+
+class RenderQueueFull(Exception):
+    pass
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, "RESUME_RENDER_WORKERS", 2),
+                thread_name_prefix="resume-render",
+            )
+        return _executor
+
+
+def submit_render_job(content, storage=None, render=compile_data_to_latex):
+    """
+    Queue a resume render on the worker pool and return its RenderJob right away.
+    Raises RenderQueueFull when RESUME_RENDER_QUEUE_SIZE jobs are already waiting or running
+    """
+    global _pending
+
+    with _lock:
+        if _pending >= getattr(settings, "RESUME_RENDER_QUEUE_SIZE", 20):
+            raise RenderQueueFull()
+        _pending += 1
+
+    try:
+        job = RenderJob.objects.create()
+        _get_executor().submit(_run_job, job.id, content, storage, render)
+    except Exception:
+        _release()
+        raise
+    return job
+
+
+def _release():
+    global _pending
+    with _lock:
+        _pending -= 1
+
+
+def _run_job(job_id, content, storage, render):
+    # worker threads get their own DB connection, make sure it is not a stale one
+    close_old_connections()
+    try:
+        RenderJob.objects.filter(id=job_id).update(status=RenderJob.RUNNING)
+        try:
+            pdf_url = render(content, storage)
+        except Exception as e:
+            print(f"Render job {job_id} crashed: {e}")
+            pdf_url = None
+
+        if pdf_url:
+            RenderJob.objects.filter(id=job_id).update(
+                status=RenderJob.SUCCEEDED, pdf_url=pdf_url, finished_at=timezone.now()
+            )
+        else:
+            RenderJob.objects.filter(id=job_id).update(
+                status=RenderJob.FAILED, error="Resume could not be compiled.", finished_at=timezone.now()
+            )
+    finally:
+        _release()
+        close_old_connections()
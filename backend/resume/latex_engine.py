@@ -0,0 +1,279 @@
+import atexit
+import glob
+import hashlib
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from django.conf import settings
+from .workspace import WARM_PREFIX, make_workspace, remove_workspace
+from .limits import run_limited, start_limited
+
+DOCUMENT_START = "\\begin{document}"
+JOB_NAME = "resume"
+# a preamble whose format dump failed is not tried again for this long
+FORMAT_RETRY_SECONDS = 600
+
+
+class LatexCompileError(Exception):
+    """
+    pdflatex ran but the document did not compile (error exit, no PDF, or timed out).
+    A cold run of the same source would fail the same way, so callers should not retry
+    """
+
+
+def split_preamble(latex_content):
+    """
+    Split a document into (preamble, body) at \\begin{document}. preamble is None if there is none
+    """
+    index = latex_content.find(DOCUMENT_START)
+    if index == -1:
+        return None, latex_content
+    return latex_content[:index], latex_content[index:]
+
+
+class _WarmProcess:
+    """
+    A pdflatex process started ahead of time in its own directory.
+
+    TeX blocks on its first terminal line (the ** prompt) until we hand it the document,
+    so process start-up, kpathsea set-up and dynamic linking are already paid for.
+    """
+    def __init__(self, fmt_name, env):
+        self.fmt_name = fmt_name
+        # the owner's pid in the name lets the workspace sweep tell a crashed worker's leftovers apart
+        self.directory = make_workspace(prefix=f"{WARM_PREFIX}{os.getpid()}-")
+        try:
+            self.proc = start_limited(
+                ["pdflatex", f"-fmt={fmt_name}", f"-jobname={JOB_NAME}"],
+                cwd=self.directory,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                env=env,
+            )
+        except OSError:
+            remove_workspace(self.directory)
+            raise
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def run(self, body, timeout=None):
+        with open(os.path.join(self.directory, "doc.tex"), "w", encoding="utf-8") as doc_file:
+            doc_file.write(body)
+
+        stdout, stderr = self.proc.communicate("\\nonstopmode\\input{doc.tex}\n", timeout=timeout)
+        pdf_path = os.path.join(self.directory, f"{JOB_NAME}.pdf")
+        if self.proc.returncode != 0 or not os.path.exists(pdf_path):
+            print(f"stdout: {stdout}")
+            raise LatexCompileError(f"warm pdflatex failed with return code {self.proc.returncode}")
+        with open(pdf_path, "rb") as pdf_file:
+            return pdf_file.read()
+
+    def discard(self):
+        if self.alive():
+            self.proc.kill()
+            self.proc.communicate()
+        remove_workspace(self.directory)
+
+
+class LatexEngine:
+    """
+    Compiles resumes against a precompiled format (.fmt) of the template preamble.
+
+    The preamble (everything before \\begin{document}) is dumped once with pdflatex -ini
+    into a format named after its sha256, so it is only rebuilt when the preamble changes.
+    Documents are then compiled by a small pool of pre-spawned pdflatex processes that
+    already have that format selected.
+    """
+    def __init__(self, fmt_dir=None, pool_size=None):
+        self._fmt_dir = fmt_dir
+        self._pool_size = pool_size
+        self._lock = threading.Lock()
+        self._pools = {}
+        # one lock per format, so a dump only holds up renders that need that same format
+        self._format_locks = {}
+        # fmt_name -> monotonic time its dump failed
+        self._failed_formats = {}
+        # formats with a refill running, so concurrent refills can't overshoot the pool size
+        self._refilling = set()
+
+    @property
+    def fmt_dir(self):
+        fmt_dir = self._fmt_dir or getattr(settings, "RESUME_LATEX_FMT_DIR", "/tmp/resume-latex-fmt")
+        os.makedirs(fmt_dir, exist_ok=True)
+        return fmt_dir
+
+    @property
+    def pool_size(self):
+        if self._pool_size is not None:
+            return self._pool_size
+        return getattr(settings, "RESUME_LATEX_WARM_POOL_SIZE", 2)
+
+    def _env(self):
+        env = os.environ.copy()
+        # trailing separator keeps the TeX distribution's own format directories searchable
+        env["TEXFORMATS"] = self.fmt_dir + os.pathsep + env.get("TEXFORMATS", "")
+        return env
+
+    def format_for(self, preamble):
+        """
+        Return the format name for this preamble, dumping it first if needed. None if the dump fails
+        """
+        fmt_name = "resume-" + hashlib.sha256(preamble.encode("utf-8")).hexdigest()[:16]
+        fmt_path = os.path.join(self.fmt_dir, f"{fmt_name}.fmt")
+        if os.path.exists(fmt_path):
+            return fmt_name
+
+        with self._lock:
+            format_lock = self._format_locks.setdefault(fmt_name, threading.Lock())
+
+        with format_lock:
+            if os.path.exists(fmt_path):
+                return fmt_name
+            failed_at = self._failed_formats.get(fmt_name)
+            if failed_at is not None and time.monotonic() - failed_at < FORMAT_RETRY_SECONDS:
+                return None
+
+            # build in a scratch dir and move into place, so other processes never load half a format
+            build_dir = tempfile.mkdtemp(prefix="fmt-", dir=self.fmt_dir)
+            try:
+                with open(os.path.join(build_dir, f"{fmt_name}.tex"), "w", encoding="utf-8") as preamble_file:
+                    preamble_file.write(preamble)
+                    preamble_file.write("\n\\dump\n")
+
+                result = run_limited(
+                    ["pdflatex", "-ini", "-interaction=nonstopmode", f"-jobname={fmt_name}", "&pdflatex", f"{fmt_name}.tex"],
+                    cwd=build_dir,
+                    stdin=subprocess.DEVNULL,
+                    text=True,
+                )
+                built = os.path.join(build_dir, f"{fmt_name}.fmt")
+                if result.returncode != 0 or not os.path.exists(built):
+                    print(f"Could not build LaTeX format {fmt_name}: {result.stdout[-2000:]}")
+                    self._failed_formats[fmt_name] = time.monotonic()
+                    return None
+                os.replace(built, fmt_path)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                print(f"Could not build LaTeX format {fmt_name}: {e}")
+                self._failed_formats[fmt_name] = time.monotonic()
+                return None
+            finally:
+                shutil.rmtree(build_dir, ignore_errors=True)
+
+            self._drop_stale_formats(fmt_name)
+        return fmt_name
+
+    def _drop_stale_formats(self, current):
+        # the preamble changed: old formats and any processes warmed with them are useless now
+        for path in glob.glob(os.path.join(self.fmt_dir, "resume-*.fmt")):
+            if os.path.basename(path) != f"{current}.fmt":
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        with self._lock:
+            stale = [self._pools.pop(name) for name in list(self._pools) if name != current]
+        for pool in stale:
+            self._drain(pool)
+
+    def _drain(self, pool):
+        while True:
+            try:
+                pool.get_nowait().discard()
+            except queue.Empty:
+                return
+
+    def _pool(self, fmt_name):
+        with self._lock:
+            return self._pools.setdefault(fmt_name, queue.Queue())
+
+    def _acquire(self, fmt_name):
+        pool = self._pool(fmt_name)
+        while True:
+            try:
+                process = pool.get_nowait()
+            except queue.Empty:
+                return _WarmProcess(fmt_name, self._env())
+            if process.alive():
+                return process
+            process.discard()
+
+    def _claim_refill(self, fmt_name):
+        with self._lock:
+            if fmt_name in self._refilling:
+                return False
+            self._refilling.add(fmt_name)
+            return True
+
+    def _refill(self, fmt_name, claimed=False):
+        # one refill per format at a time, a second one would race on qsize() and overfill the pool
+        if not claimed and not self._claim_refill(fmt_name):
+            return
+        pool = self._pool(fmt_name)
+        try:
+            while pool.qsize() < self.pool_size:
+                pool.put(_WarmProcess(fmt_name, self._env()))
+        except OSError as e:
+            print(f"Could not pre-spawn pdflatex: {e}")
+        finally:
+            with self._lock:
+                self._refilling.discard(fmt_name)
+
+    def warm_up(self, latex_content):
+        """
+        Build the format and fill the process pool ahead of the first render
+        """
+        preamble, _ = split_preamble(latex_content)
+        if preamble is None:
+            return
+        fmt_name = self.format_for(preamble)
+        if fmt_name is not None:
+            self._refill(fmt_name)
+
+    def compile(self, latex_content, timeout=None):
+        """
+        Compile a full document and return the PDF bytes. Returns None when the warm path itself
+        can't be used (no preamble, format dump or spawn failed) so the caller can run pdflatex
+        cold, and raises LatexCompileError when the document fails to compile
+        """
+        preamble, body = split_preamble(latex_content)
+        if preamble is None:
+            return None
+        fmt_name = self.format_for(preamble)
+        if fmt_name is None:
+            return None
+
+        try:
+            process = self._acquire(fmt_name)
+        except OSError as e:
+            print(f"Could not start pdflatex: {e}")
+            return None
+
+        try:
+            return process.run(body, timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            raise LatexCompileError(f"warm pdflatex timed out after {timeout} seconds") from e
+        except OSError as e:
+            print(f"warm pdflatex failed: {e}")
+            return None
+        finally:
+            process.discard()
+            # top the pool back up off the request path, unless a refill is already on it
+            if self._claim_refill(fmt_name):
+                threading.Thread(target=self._refill, args=(fmt_name, True), daemon=True).start()
+
+    def shutdown(self):
+        with self._lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            self._drain(pool)
+
+
+latex_engine = LatexEngine()
+atexit.register(latex_engine.shutdown)
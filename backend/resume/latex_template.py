@@ -0,0 +1,58 @@
+import re
+
+PERSONAL_INFO_MARKER = "% INSERT_PERSONAL_INFO"
+EXPERIENCES_MARKER = "% INSERT_EXPERIENCES"
+EDUCATION_MARKER = "% INSERT_EDUCATION"
+PROJECTS_MARKER = "% INSERT_PROJECTS"
+SKILLS_MARKER = "% INSERT_SKILLS"
+
+RESUME_MARKERS = (
+    PERSONAL_INFO_MARKER,
+    EXPERIENCES_MARKER,
+    EDUCATION_MARKER,
+    PROJECTS_MARKER,
+    SKILLS_MARKER,
+)
+
+
+class TemplateError(ValueError):
+    pass
+
+
+class ParsedTemplate:
+    """
+    A LaTeX template split once into literal segments and marker slots.
+
+    Rendering copies the segment list, drops each section into its slots and joins once,
+    so filling the template costs one pass over the document however many markers it has.
+    """
+    def __init__(self, text, markers=RESUME_MARKERS, strict=True):
+        markers = tuple(markers)
+        # longest first, so a marker that prefixes another can't steal its match
+        pattern = "|".join(re.escape(marker) for marker in sorted(markers, key=len, reverse=True))
+        # the capturing group keeps each marker in the split result, at the odd indices
+        self._parts = re.split(f"({pattern})", text) if markers else [text]
+        self._slots = {}
+        for index in range(1, len(self._parts), 2):
+            self._slots.setdefault(self._parts[index], []).append(index)
+
+        self.missing = [marker for marker in markers if marker not in self._slots]
+        if strict and self.missing:
+            raise TemplateError(f"Template is missing markers: {', '.join(self.missing)}")
+
+    @property
+    def markers(self):
+        return tuple(self._slots)
+
+    def render(self, sections):
+        """
+        Return the document with each marker replaced by its section. Markers whose section
+        is missing or blank are left in place (they are LaTeX comments)
+        """
+        parts = self._parts.copy()
+        for marker, indices in self._slots.items():
+            latex = sections.get(marker)
+            if latex and latex.strip():
+                for index in indices:
+                    parts[index] = latex
+        return "".join(parts)
@@ -0,0 +1,99 @@
+import os
+import shutil
+import subprocess
+from django.conf import settings
+
+try:
+    import resource
+except ImportError:  # not available on Windows, compiles just run without rlimits there
+    resource = None
+
+
+def compile_timeout():
+    """
+    Wall-clock seconds a single pdflatex run may take
+    """
+    return getattr(settings, "RESUME_COMPILE_TIMEOUT", 30)
+
+
+def _clamp(limit, soft, hard):
+    # an unprivileged process can't raise its hard limit, stay under the one we were started with
+    current = resource.getrlimit(limit)[1]
+    if current != resource.RLIM_INFINITY:
+        hard = min(hard, current)
+    return min(soft, hard), hard
+
+
+def _limits():
+    limits = []
+    if resource is None:
+        return limits
+    cpu_seconds = getattr(settings, "RESUME_COMPILE_CPU_SECONDS", 20)
+    memory_mb = getattr(settings, "RESUME_COMPILE_MEMORY_MB", 2048)
+    if cpu_seconds:
+        # SIGXCPU at the soft limit, SIGKILL a second later if it is ignored
+        limits.append((resource.RLIMIT_CPU, _clamp(resource.RLIMIT_CPU, cpu_seconds, cpu_seconds + 1)))
+    if memory_mb:
+        limits.append((resource.RLIMIT_AS, _clamp(resource.RLIMIT_AS, *(memory_mb * 1024 * 1024,) * 2)))
+    return limits
+
+
+def _prlimit_command(prlimit, args, limits):
+    options = {resource.RLIMIT_CPU: "--cpu", resource.RLIMIT_AS: "--as"}
+    return [prlimit, *(f"{options[limit]}={soft}:{hard}" for limit, (soft, hard) in limits), "--", *args]
+
+
+def _set_own_limits(limits):
+    for limit, values in limits:
+        try:
+            resource.setrlimit(limit, values)
+        except (ValueError, OSError):
+            pass
+
+
+def start_limited(args, **popen_kwargs):
+    """
+    Popen a pdflatex process with the RESUME_COMPILE_CPU_SECONDS / RESUME_COMPILE_MEMORY_MB rlimits.
+
+    Where the util-linux prlimit command is installed it wraps pdflatex, so the limits are in
+    place before pdflatex is exec'd (same pid, so kill() and timeouts still reach it). Without
+    it, Linux applies them with prlimit() right after the process starts, which avoids running
+    Python in the forked child (preexec_fn is not safe when other threads hold locks) but leaves
+    a brief unlimited window. Elsewhere they fall back to preexec_fn
+    """
+    limits = _limits()
+    prlimit = shutil.which("prlimit") if limits else None
+    if prlimit:
+        env = popen_kwargs.get("env") or os.environ
+        if shutil.which(args[0], path=env.get("PATH")) is None:
+            # keep raising OSError for a missing pdflatex, as Popen does, rather than a prlimit exit code
+            raise FileNotFoundError(f"{args[0]} not found on PATH")
+        return subprocess.Popen(_prlimit_command(prlimit, args, limits), **popen_kwargs)
+    use_prlimit = hasattr(resource, "prlimit")
+    if limits and not use_prlimit:
+        popen_kwargs["preexec_fn"] = lambda: _set_own_limits(limits)
+
+    proc = subprocess.Popen(args, **popen_kwargs)
+    if limits and use_prlimit:
+        for limit, values in limits:
+            try:
+                resource.prlimit(proc.pid, limit, values)
+            except (ValueError, OSError):
+                # the process may already have exited
+                pass
+    return proc
+
+
+def run_limited(args, timeout=None, **popen_kwargs):
+    """
+    subprocess.run for pdflatex: rlimits, and a wall-clock timeout (compile_timeout() by default)
+    after which the process is killed and subprocess.TimeoutExpired is raised
+    """
+    proc = start_limited(args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, **popen_kwargs)
+    try:
+        stdout, stderr = proc.communicate(timeout=timeout or compile_timeout())
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.communicate()
+        raise
+    return subprocess.CompletedProcess(args, proc.returncode, stdout, stderr)
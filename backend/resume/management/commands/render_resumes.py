@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from resume.batch import ManifestError, load_manifest, render_variants
+
+
+class Command(BaseCommand):
+    help = "Render every resume variant in a JSON manifest to PDF, in parallel"
+
+    def add_arguments(self, parser):
+        parser.add_argument("manifest", help="JSON file listing the variants (see resume/batch.py load_manifest)")
+        parser.add_argument("--output-dir", help="Write <name>.pdf files here instead of to the artifact storage")
+        parser.add_argument("--workers", type=int, help="pdflatex worker processes (default RESUME_BATCH_WORKERS)")
+
+    def handle(self, *args, **options):
+        try:
+            variants = load_manifest(options["manifest"])
+        except (OSError, ValueError, ManifestError) as e:
+            raise CommandError(f"Could not read manifest: {e}")
+        if not variants:
+            raise CommandError("The manifest has no variants.")
+
+        batch = render_variants(variants, output_dir=options["output_dir"], workers=options["workers"])
+
+        name_width = max(len(result.name) for result in batch.results)
+        self.stdout.write(f"{'variant':<{name_width}}  {'assemble':>9}  {'compile':>9}  result")
+        for result in batch.results:
+            compile_column = "cached" if result.cached else f"{result.compile_seconds * 1000:.0f} ms"
+            outcome = result.location if result.ok else self.style.ERROR(result.error)
+            self.stdout.write(f"{result.name:<{name_width}}  {result.assemble_seconds * 1000:>6.1f} ms  {compile_column:>9}  {outcome}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(batch.succeeded)}/{len(batch.results)} variants in {batch.seconds:.2f}s ({batch.throughput:.2f} resumes/s)"
+        ))
+        if len(batch.succeeded) != len(batch.results):
+            raise CommandError("Some variants failed.")
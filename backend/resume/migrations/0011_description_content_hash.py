@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:03
+
+import hashlib
+from django.db import migrations, models
+
+
+def fill_content_hash(apps, schema_editor):
+    Description = apps.get_model('resume', 'Description')
+    descriptions = list(Description.objects.only('id', 'content'))
+    for description in descriptions:
+        description.content_hash = hashlib.sha256(description.content.encode('utf-8')).hexdigest()
+    Description.objects.bulk_update(descriptions, ['content_hash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume', '0010_renderjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='description',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.RunPython(fill_content_hash, migrations.RunPython.noop),
+    ]
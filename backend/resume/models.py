@@ -1,7 +1,20 @@
+import hashlib
+import uuid
 from django.db import models
 
 class Description(models.Model):
     content = models.CharField()
+    # sha256 of content, indexed so bullets can be looked up by content without scanning the table
+    content_hash = models.CharField(max_length=64, db_index=True, editable=False, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @staticmethod
+    def hash_content(content):
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def save(self, *args, **kwargs):
+        self.content_hash = self.hash_content(self.content)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.content}"
@@ -13,6 +26,7 @@ class Education(models.Model):
     start_date = models.CharField(null=True, blank=True)
     end_date = models.CharField(null=True, blank=True)
     gpa = models.CharField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.school} - {self.major} - {self.location}"
@@ -25,6 +39,7 @@ class Experience(models.Model):
     end_date = models.CharField(null=True, blank=True)
     descriptions  = models.ManyToManyField(Description, null=True, blank=True)
     included = models.BooleanField(default=False, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.title} - {self.organisation} - {self.location}"
@@ -35,12 +50,36 @@ class Project(models.Model):
     source_code = models.CharField(null=True, blank=True)
     descriptions = models.ManyToManyField(Description, null=True, blank=True)
     included = models.BooleanField(default=False, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} - {self.tools}"
 
 class Skill(models.Model):
     content = models.CharField()
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.content}"
+
+class RenderJob(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    status = models.CharField(choices=STATUS_CHOICES, default=PENDING)
+    pdf_url = models.CharField(null=True, blank=True)
+    error = models.CharField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.id} - {self.status}"
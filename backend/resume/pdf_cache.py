@@ -0,0 +1,135 @@
+import hashlib
+import os
+import threading
+import uuid
+from django.conf import settings
+from .timing import timed_stage
+
+# bump when the compile step itself changes in a way that alters the PDF for the same source
+COMPILER_VERSION = "pdflatex-1"
+
+
+class PdfCache:
+    """
+    Content-addressed cache of compiled PDFs.
+
+    The key is a sha256 of the fully rendered LaTeX source plus the template version,
+    so identical resumes map to the same PDF. Compiled PDFs are kept on local disk
+    (evicted least-recently-used first once the directory grows past max_bytes) and
+    are saved to the artifact storage under the same digest, so other workers can reuse them too.
+    """
+    def __init__(self, directory=None, max_bytes=None):
+        self._directory = directory
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self):
+        directory = self._directory or getattr(settings, "RESUME_PDF_CACHE_DIR", "/tmp/resume-pdf-cache")
+        os.makedirs(directory, exist_ok=True)
+        return directory
+
+    @property
+    def max_bytes(self):
+        if self._max_bytes is not None:
+            return self._max_bytes
+        return getattr(settings, "RESUME_PDF_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+
+    @staticmethod
+    def digest(latex_content, template_version):
+        sha = hashlib.sha256()
+        sha.update(COMPILER_VERSION.encode("utf-8"))
+        sha.update(b"\0")
+        sha.update((template_version or "").encode("utf-8"))
+        sha.update(b"\0")
+        sha.update(latex_content.encode("utf-8"))
+        return sha.hexdigest()
+
+    def _path(self, digest):
+        return os.path.join(self.directory, f"{digest}.pdf")
+
+    def get_local(self, digest):
+        """
+        Return cached PDF bytes for digest, or None. A hit marks the entry as recently used
+        """
+        path = self._path(digest)
+        try:
+            with open(path, "rb") as pdf_file:
+                pdf_bytes = pdf_file.read()
+        except FileNotFoundError:
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return pdf_bytes
+
+    def put_local(self, digest, pdf_bytes):
+        """
+        Keep the PDF for later renders. Never raises: a full or read-only cache directory
+        only costs the next render a compile
+        """
+        temp_path = None
+        try:
+            path = self._path(digest)
+            # write to a temp name then rename, so readers never see half a PDF
+            temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+            with open(temp_path, "wb") as pdf_file:
+                pdf_file.write(pdf_bytes)
+            os.replace(temp_path, path)
+            self.evict()
+        except OSError as e:
+            print(f"Could not store PDF in the local cache: {e}")
+            if temp_path is not None:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+
+    def evict(self):
+        """
+        Delete least-recently-used PDFs until the cache fits in max_bytes
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(".pdf"):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except FileNotFoundError:
+                    pass
+
+    def exists_remote(self, storage, key):
+        """
+        Check whether a PDF for this digest was already stored by any worker
+        """
+        try:
+            with timed_stage("pdf_exists"):
+                return storage.exists(key)
+        except Exception as e:
+            print(f"Could not check PDF cache in storage: {e}")
+            return False
+
+    def clear(self):
+        with self._lock:
+            for name in os.listdir(self.directory):
+                if name.endswith(".pdf"):
+                    os.remove(os.path.join(self.directory, name))
+
+
+pdf_cache = PdfCache()
@@ -0,0 +1,98 @@
+import hashlib
+import threading
+import uuid
+from django.conf import settings
+from django.core.cache import caches
+
+EDUCATION = "education"
+EXPERIENCES = "experiences"
+PROJECTS = "projects"
+SKILLS = "skills"
+
+
+def _new_generation():
+    return uuid.uuid4().hex
+
+
+class ResponseCache:
+    """
+    Rendered JSON bodies of the read endpoints, stored in Django's cache framework.
+
+    Every section (education, experiences, projects, skills) has a generation token kept in
+    the cache itself. Keys include the generations of the sections a response is built from,
+    so invalidating a section is a single set and every process sharing the cache backend
+    stops seeing the old bodies. Model and m2m signals (see signals.py) do the invalidating.
+    """
+    def __init__(self, alias=None, timeout=None):
+        self._alias = alias
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self):
+        return getattr(settings, "RESUME_RESPONSE_CACHE_ENABLED", False)
+
+    @property
+    def cache(self):
+        return caches[self._alias or getattr(settings, "RESUME_RESPONSE_CACHE_ALIAS", "default")]
+
+    @property
+    def timeout(self):
+        if self._timeout is not None:
+            return self._timeout
+        return getattr(settings, "RESUME_RESPONSE_CACHE_TIMEOUT", 3600)
+
+    def _generation_key(self, section):
+        return f"resume-response:generation:{section}"
+
+    def key(self, sections, path):
+        """
+        Cache key for a request path built from the given sections, at their current generations
+        """
+        generation_keys = [self._generation_key(section) for section in sections]
+        generations = self.cache.get_many(generation_keys)
+        for generation_key in generation_keys:
+            if generation_key not in generations:
+                # a fresh (or evicted) generation never repeats an old value
+                self.cache.add(generation_key, _new_generation(), None)
+                generations[generation_key] = self.cache.get(generation_key)
+        digest = hashlib.sha1(path.encode("utf-8")).hexdigest()
+        versions = ".".join(str(generations[generation_key]) for generation_key in generation_keys)
+        return f"resume-response:{digest}:{versions}"
+
+    def get(self, key):
+        entry = self.cache.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return entry
+
+    def set(self, key, entry):
+        self.cache.set(key, entry, self.timeout)
+
+    def invalidate(self, *sections):
+        # a new random value rather than incr: incr is a get then a set on the file and locmem
+        # backends, so two writes committing together could both land on the same generation
+        self.cache.set_many({self._generation_key(section): _new_generation() for section in sections}, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        self.cache.clear()
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,114 @@
+import os
+import threading
+import boto3
+from botocore.config import Config
+from django.conf import settings
+
+# One boto3 session/client per process. boto3 clients are thread-safe once built,
+# but building them is not, so creation is guarded by a lock.
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+
+_stats = {
+    "clients_created": 0,
+    "client_reuses": 0,
+    "http_requests": 0,
+}
+
+
+def _client_config():
+    """
+    Build the botocore config (connection pool size, keep-alive, timeouts) from settings
+    """
+    return Config(
+        region_name=settings.AWS_S3_REGION_NAME,
+        max_pool_connections=getattr(settings, "AWS_S3_MAX_POOL_CONNECTIONS", 10),
+        connect_timeout=getattr(settings, "AWS_S3_CONNECT_TIMEOUT", 5),
+        read_timeout=getattr(settings, "AWS_S3_READ_TIMEOUT", 30),
+        tcp_keepalive=getattr(settings, "AWS_S3_TCP_KEEPALIVE", True),
+        retries={"max_attempts": getattr(settings, "AWS_S3_MAX_RETRIES", 3), "mode": "standard"},
+    )
+
+
+def _count_request(**kwargs):
+    with _lock:
+        _stats["http_requests"] += 1
+
+
+def get_s3_client():
+    """
+    Return the process-wide S3 client, creating it on first use
+    """
+    global _client, _client_pid
+
+    pid = os.getpid()
+    # fast path, no lock needed once the client exists in this process
+    if _client is not None and _client_pid == pid:
+        with _lock:
+            _stats["client_reuses"] += 1
+        return _client
+
+    with _lock:
+        # a forked child must not share the parent's sockets, so rebuild after fork
+        if _client is None or _client_pid != pid:
+            session = boto3.session.Session(
+                aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
+                aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
+                region_name=settings.AWS_S3_REGION_NAME,
+            )
+            client = session.client("s3", config=_client_config())
+            client.meta.events.register("before-send.s3", _count_request)
+            _client = client
+            _client_pid = pid
+            _stats["clients_created"] += 1
+        else:
+            _stats["client_reuses"] += 1
+        return _client
+
+
+def reset_s3_client():
+    """
+    Drop the cached client so the next call picks up new settings or credentials
+    """
+    global _client, _client_pid
+    with _lock:
+        if _client is not None:
+            try:
+                _client.close()
+            except Exception:
+                pass
+        _client = None
+        _client_pid = None
+
+
+def _connections_opened(client):
+    """
+    Count the TCP connections urllib3 has opened for this client.
+
+    botocore has no public API for this, so it reads private attributes
+    (client._endpoint.http_session._manager). Returns None when those change shape,
+    and callers leave the connection counters out
+    """
+    try:
+        manager = client._endpoint.http_session._manager
+        pools = [manager.pools[key] for key in manager.pools.keys()]
+    except Exception:
+        return None
+    return sum(getattr(pool, "num_connections", 0) for pool in pools)
+
+
+def s3_pool_stats():
+    """
+    Return counters describing how much the shared client and its connections are reused.
+    Exported on /metrics
+    """
+    with _lock:
+        stats = dict(_stats)
+        client = _client
+
+    opened = _connections_opened(client) if client is not None else 0
+    stats["connections_opened"] = opened
+    if opened is not None:
+        stats["connection_reuses"] = max(stats["http_requests"] - opened, 0)
+    return stats
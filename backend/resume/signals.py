@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.dispatch import receiver
+from django.utils import timezone
+from .models import Education, Experience, Project, Skill, Description
+from .fragments import fragment_cache, EXPERIENCE, PROJECT, EDUCATION
+from . import response_cache as responses
+
+MODEL_LABELS = {
+    Experience: EXPERIENCE,
+    Project: PROJECT,
+    Education: EDUCATION,
+}
+
+
+@receiver(post_save, sender=Experience)
+@receiver(post_save, sender=Project)
+@receiver(post_save, sender=Education)
+@receiver(post_delete, sender=Experience)
+@receiver(post_delete, sender=Project)
+@receiver(post_delete, sender=Education)
+def invalidate_row_fragment(sender, instance, **kwargs):
+    fragment_cache.invalidate(MODEL_LABELS[sender], instance.pk)
+
+
+def _touch_owners(model, pks):
+    # unlinking or deleting a bullet leaves no timestamp behind, stamp the owners so their
+    # ETag and Last-Modified move (.update() skips auto_now and sends no signals)
+    model.objects.filter(pk__in=pks).update(updated_at=timezone.now())
+
+
+def _description_owner_ids(model, description_id):
+    return model.descriptions.through.objects.filter(description_id=description_id).values_list(f"{model._meta.model_name}_id", flat=True)
+
+
+def _invalidate_descriptions_owner(model, model_label, instance, action, reverse, pk_set):
+    if action == "pre_clear" and reverse:
+        # description.experience_set.clear(): read the owners while the links still exist
+        _touch_owners(model, list(_description_owner_ids(model, instance.pk)))
+        return
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        # experience.descriptions.add/remove/clear(...)
+        fragment_cache.invalidate(model_label, instance.pk)
+        _touch_owners(model, [instance.pk])
+    elif pk_set:
+        # description.experience_set.add/remove(...)
+        for pk in pk_set:
+            fragment_cache.invalidate(model_label, pk)
+        _touch_owners(model, pk_set)
+    else:
+        # description.experience_set.clear(): the owners are already unlinked, drop them all
+        fragment_cache.invalidate_model(model_label)
+
+
+@receiver(m2m_changed, sender=Experience.descriptions.through)
+def invalidate_experience_descriptions(sender, instance, action, reverse, pk_set, **kwargs):
+    _invalidate_descriptions_owner(Experience, EXPERIENCE, instance, action, reverse, pk_set)
+
+
+@receiver(m2m_changed, sender=Project.descriptions.through)
+def invalidate_project_descriptions(sender, instance, action, reverse, pk_set, **kwargs):
+    _invalidate_descriptions_owner(Project, PROJECT, instance, action, reverse, pk_set)
+
+
+@receiver(post_save, sender=Description)
+@receiver(pre_delete, sender=Description)
+def invalidate_description_owners(sender, instance, created=False, **kwargs):
+    # an edited bullet changes every experience and project that shows it
+    # (pre_delete, because the links are already gone by post_delete)
+    if created:
+        return
+    for model, model_label in ((Experience, EXPERIENCE), (Project, PROJECT)):
+        owner_ids = list(_description_owner_ids(model, instance.pk))
+        for pk in owner_ids:
+            fragment_cache.invalidate(model_label, pk)
+        if kwargs["signal"] is pre_delete:
+            _touch_owners(model, owner_ids)
+
+
+RESPONSE_SECTIONS = {
+    Education: (responses.EDUCATION,),
+    Experience: (responses.EXPERIENCES,),
+    Experience.descriptions.through: (responses.EXPERIENCES,),
+    Project: (responses.PROJECTS,),
+    Project.descriptions.through: (responses.PROJECTS,),
+    Skill: (responses.SKILLS,),
+    # bullets are nested in both experiences and projects
+    Description: (responses.EXPERIENCES, responses.PROJECTS),
+}
+
+
+@receiver(post_save)
+@receiver(post_delete)
+@receiver(m2m_changed)
+def invalidate_cached_responses(sender, **kwargs):
+    sections = RESPONSE_SECTIONS.get(sender)
+    if sections and not kwargs.get("action", "post_").startswith("pre_"):
+        # after commit, so a concurrent read cannot cache the old rows under the new generation
+        transaction.on_commit(lambda: responses.response_cache.invalidate(*sections))
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    # RESUME_SQLITE_PRAGMAS are per connection (apart from journal_mode), so every new one gets them
+    if connection.vendor != "sqlite":
+        return
+    pragmas = getattr(settings, "RESUME_SQLITE_PRAGMAS", {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
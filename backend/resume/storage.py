@@ -0,0 +1,243 @@
+import hashlib
+import os
+import threading
+import uuid
+from botocore.exceptions import BotoCoreError, ClientError
+from django.conf import settings
+from .s3 import get_s3_client
+
+S3 = "s3"
+LOCAL = "local"
+MEMORY = "memory"
+
+
+class StorageError(Exception):
+    pass
+
+
+class ArtifactStorage:
+    """
+    Where the render pipeline reads templates from and writes rendered .tex sources and PDFs to.
+    Keys are slash separated paths such as latex_templates/base_template.tex
+    """
+    @property
+    def cache_id(self):
+        """
+        Identifies this storage in the in-memory template cache
+        """
+        raise NotImplementedError
+
+    def get_template(self, key, version=None):
+        """
+        Return (text, version) for a template. When version is given and the template has not
+        changed since, return None without reading it again
+        """
+        raise NotImplementedError
+
+    def put_tex(self, key, latex_content):
+        raise NotImplementedError
+
+    def put_pdf(self, key, pdf_bytes):
+        """
+        Store a PDF and return its URL
+        """
+        raise NotImplementedError
+
+    def exists(self, key):
+        raise NotImplementedError
+
+    def url(self, key):
+        raise NotImplementedError
+
+
+class S3Storage(ArtifactStorage):
+    """
+    Artifacts in an S3 bucket, through the shared boto3 client. Templates are revalidated with
+    conditional GETs (IfNoneMatch on the ETag)
+    """
+    def __init__(self, bucket_name):
+        self.bucket_name = bucket_name
+
+    @property
+    def cache_id(self):
+        return (S3, self.bucket_name)
+
+    def get_template(self, key, version=None):
+        params = {"Bucket": self.bucket_name, "Key": key}
+        if version:
+            params["IfNoneMatch"] = version
+        try:
+            s3_object = get_s3_client().get_object(**params)
+            text = s3_object['Body'].read().decode('utf-8')
+        except ClientError as e:
+            if e.response.get("ResponseMetadata", {}).get("HTTPStatusCode") == 304:
+                return None
+            raise StorageError(f"Could not get {key} from S3: {e}") from e
+        except BotoCoreError as e:
+            raise StorageError(f"Could not get {key} from S3: {e}") from e
+        return text, s3_object.get("ETag")
+
+    def _put(self, key, body, content_type):
+        try:
+            get_s3_client().put_object(Body=body, Bucket=self.bucket_name, Key=key, ContentType=content_type)
+        except (BotoCoreError, ClientError) as e:
+            raise StorageError(f"Could not upload {key} to S3: {e}") from e
+
+    def put_tex(self, key, latex_content):
+        self._put(key, latex_content, 'application/x-tex')
+
+    def put_pdf(self, key, pdf_bytes):
+        self._put(key, pdf_bytes, 'application/pdf')
+        return self.url(key)
+
+    def exists(self, key):
+        try:
+            get_s3_client().head_object(Bucket=self.bucket_name, Key=key)
+            return True
+        except ClientError:
+            return False
+        except BotoCoreError as e:
+            raise StorageError(f"Could not check {key} in S3: {e}") from e
+
+    def url(self, key):
+        return f"https://{self.bucket_name}.s3.amazonaws.com/{key}"
+
+
+class LocalStorage(ArtifactStorage):
+    """
+    Artifacts in a directory on local disk, for single-node deployments with no network I/O.
+    A template's version is its mtime and size, so revalidating it is a single stat().
+    PDFs are served from base_url (see resume/urls.py)
+    """
+    def __init__(self, root, base_url="/resume-files/"):
+        self.root = os.path.abspath(root)
+        self.base_url = base_url
+
+    @property
+    def cache_id(self):
+        return (LOCAL, self.root)
+
+    def path(self, key):
+        path = os.path.abspath(os.path.join(self.root, key))
+        if os.path.commonpath([self.root, path]) != self.root:
+            raise StorageError(f"{key} is outside the storage directory")
+        return path
+
+    def get_template(self, key, version=None):
+        path = self.path(key)
+        try:
+            stat = os.stat(path)
+            current = f"{stat.st_mtime_ns}-{stat.st_size}"
+            if version == current:
+                return None
+            with open(path, encoding='utf-8') as template_file:
+                return template_file.read(), current
+        except OSError as e:
+            raise StorageError(f"Could not read {path}: {e}") from e
+
+    def _write(self, key, data):
+        path = self.path(key)
+        # write to a temp name then rename, so readers never see half a file
+        temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp_path, "wb") as out_file:
+                out_file.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            raise StorageError(f"Could not write {path}: {e}") from e
+
+    def put_tex(self, key, latex_content):
+        self._write(key, latex_content.encode('utf-8'))
+
+    def put_pdf(self, key, pdf_bytes):
+        self._write(key, pdf_bytes)
+        return self.url(key)
+
+    def exists(self, key):
+        return os.path.exists(self.path(key))
+
+    def url(self, key):
+        return f"{self.base_url}{key}"
+
+
+class MemoryStorage(ArtifactStorage):
+    """
+    Artifacts in a dict, for tests and benchmarks that must run offline
+    """
+    def __init__(self, files=None):
+        self.files = dict(files or {})
+        self._lock = threading.Lock()
+
+    @property
+    def cache_id(self):
+        return (MEMORY, id(self))
+
+    def get_template(self, key, version=None):
+        with self._lock:
+            if key not in self.files:
+                raise StorageError(f"{key} does not exist")
+            text = self.files[key]
+        if isinstance(text, bytes):
+            text = text.decode('utf-8')
+        current = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        if version == current:
+            return None
+        return text, current
+
+    def put_tex(self, key, latex_content):
+        with self._lock:
+            self.files[key] = latex_content
+
+    def put_pdf(self, key, pdf_bytes):
+        with self._lock:
+            self.files[key] = pdf_bytes
+        return self.url(key)
+
+    def exists(self, key):
+        with self._lock:
+            return key in self.files
+
+    def url(self, key):
+        return f"memory://{key}"
+
+
+_lock = threading.Lock()
+_storage = None
+
+
+def build_storage(backend=None):
+    """
+    Create the storage named by backend, or by RESUME_STORAGE_BACKEND
+    """
+    backend = backend or getattr(settings, "RESUME_STORAGE_BACKEND", S3)
+    if backend == S3:
+        return S3Storage(getattr(settings, "RESUME_STORAGE_BUCKET", "jake-resume-for-me"))
+    if backend == LOCAL:
+        return LocalStorage(
+            getattr(settings, "RESUME_LOCAL_STORAGE_DIR", "resume-storage"),
+            getattr(settings, "RESUME_LOCAL_STORAGE_URL", "/resume-files/"),
+        )
+    if backend == MEMORY:
+        return MemoryStorage()
+    raise ValueError(f"Unknown RESUME_STORAGE_BACKEND {backend!r}")
+
+
+def get_storage():
+    """
+    Return the process-wide artifact storage configured in settings
+    """
+    global _storage
+    with _lock:
+        if _storage is None:
+            _storage = build_storage()
+        return _storage
+
+
+def set_storage(storage):
+    """
+    Replace the process-wide storage (None rebuilds it from settings on next use)
+    """
+    global _storage
+    with _lock:
+        _storage = storage
@@ -0,0 +1,143 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from django.conf import settings
+from .latex_template import ParsedTemplate
+
+BASE_TEMPLATE_KEY = "latex_templates/base_template.tex"
+
+
+class TemplateEntry:
+    """
+    A decoded template, the version its storage reported for it (the S3 ETag) and its parsed form
+    """
+    def __init__(self, text, etag):
+        self.text = text
+        self.etag = etag
+        self.checked_at = time.monotonic()
+        self._parsed = None
+
+    @property
+    def parsed(self):
+        """
+        The template split into segments and marker slots, parsed once per fetched version
+        """
+        if self._parsed is None:
+            self._parsed = ParsedTemplate(self.text)
+        return self._parsed
+
+
+class TemplateCache:
+    """
+    In-memory cache of LaTeX templates keyed by (storage, key).
+
+    Entries are served straight from memory until they are older than the TTL, then
+    revalidated against the storage (a conditional GET with IfNoneMatch on S3). If the
+    storage errors or does not answer within the revalidate timeout, the cached copy is
+    served and the check finishes in the background. Only the caller that starts a check
+    waits for it, everyone else gets the cached copy while it runs.
+    """
+    def __init__(self, ttl=None, revalidate_timeout=None):
+        self._ttl = ttl
+        self._revalidate_timeout = revalidate_timeout
+        self._entries = {}
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="template-revalidate")
+
+    @property
+    def ttl(self):
+        if self._ttl is not None:
+            return self._ttl
+        return getattr(settings, "LATEX_TEMPLATE_CACHE_TTL", 300)
+
+    @property
+    def revalidate_timeout(self):
+        if self._revalidate_timeout is not None:
+            return self._revalidate_timeout
+        return getattr(settings, "LATEX_TEMPLATE_REVALIDATE_TIMEOUT", 1.0)
+
+    def get(self, storage, key):
+        """
+        Return the TemplateEntry for key in storage, fetching or revalidating as needed
+        """
+        cache_key = (storage.cache_id, key)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+
+        # first use, nothing to fall back to so errors go to the caller
+        if entry is None:
+            entry = self._fetch(storage, key)
+            with self._lock:
+                self._entries[cache_key] = entry
+            return entry
+
+        if time.monotonic() - entry.checked_at < self.ttl:
+            return entry
+
+        future = self._start_revalidation(storage, cache_key, entry)
+        if future is None:
+            # another caller is already revalidating (maybe stuck on a slow GET), don't wait on it too
+            return entry
+        try:
+            return future.result(timeout=self.revalidate_timeout)
+        except FutureTimeoutError:
+            print(f"Template revalidation for {key} is slow, serving cached copy")
+            return entry
+
+    def get_text(self, storage, key):
+        return self.get(storage, key).text
+
+    def invalidate(self, storage=None, key=None):
+        """
+        Drop one entry, or everything when called without arguments
+        """
+        with self._lock:
+            if storage is None:
+                self._entries.clear()
+            else:
+                self._entries.pop((storage.cache_id, key), None)
+
+    def _start_revalidation(self, storage, cache_key, entry):
+        # only one revalidation per key at a time; returns None when one is already running
+        with self._lock:
+            if cache_key in self._inflight:
+                return None
+            future = self._executor.submit(self._revalidate, storage, cache_key, entry)
+            self._inflight[cache_key] = future
+        return future
+
+    def _revalidate(self, storage, cache_key, entry):
+        _, key = cache_key
+        try:
+            try:
+                fresh = self._fetch(storage, key, etag=entry.etag)
+            except Exception as e:
+                # storage down, or a changed template that can't be decoded: the cached copy still works
+                print(f"Template revalidation failed, serving cached copy: {e}")
+                fresh = None
+
+            with self._lock:
+                if fresh is None:
+                    # not modified, or storage unavailable: keep the text, restart the TTL
+                    entry.checked_at = time.monotonic()
+                    fresh = entry
+                self._entries[cache_key] = fresh
+            return fresh
+        finally:
+            # a finished future must never be handed out again, whatever happened above
+            with self._lock:
+                self._inflight.pop(cache_key, None)
+
+    def _fetch(self, storage, key, etag=None):
+        """
+        Read the template. With an etag, returns None when it has not changed
+        """
+        fetched = storage.get_template(key, etag)
+        if fetched is None:
+            return None
+        return TemplateEntry(*fetched)
+
+
+template_cache = TemplateCache()
+
@@ -1,3 +1,1008 @@
-from django.test import TestCase
+import io
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from unittest import mock, skipUnless
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+from django.db import connection
+from django.http import Http404
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from .models import Education, Experience, Project, Skill, Description, RenderJob
+from .assembly import load_resume_content, load_resume_library
+from .batch import BATCH_OUTPUT_FOLDER, load_manifest, variant_content
+from .draft import render_draft_pdf
+from .jobs import _run_job
+from .latex_engine import LatexEngine
+from .limits import run_limited
+from .workspace import CompileQueueFull, CompileQueueTimeout, compile_root, compile_slot, compile_workspace
+from .fragments import EDUCATION, EXPERIENCE, PROJECT, fragment_cache
+from .response_cache import EXPERIENCES as EXPERIENCES_SECTION, response_cache
+from .signals import apply_sqlite_pragmas
+from .timing import stage_metrics
+from .s3 import get_s3_client, reset_s3_client, s3_pool_stats
+from .storage import LocalStorage, MemoryStorage, set_storage
+from .template_cache import BASE_TEMPLATE_KEY, TemplateCache
+from .latex_template import (
+    EXPERIENCES_MARKER, PERSONAL_INFO_MARKER, PROJECTS_MARKER, RESUME_MARKERS, SKILLS_MARKER, ParsedTemplate, TemplateError,
+)
+from .pdf_cache import PdfCache
+from .urls import LOCAL_PDF_PATH
+from .views import local_pdf
+from .utils import UPLOAD_SKIP, compile_data_to_latex, compile_latex_source, compile_latex_to_s3, compile_latex_to_pdf, escape_latex, escape_latex_many, render_resume_latex, render_resume_pdf, resume_pdf_key
 
-# Create your tests here.
+
+class ResumeLibraryTestCase(TestCase):
+    def setUp(self):
+        response_cache.clear()
+
+    def create_library(self, size):
+        # run the on-commit cache invalidation the way a real request would
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_library(size)
+
+    def _create_library(self, size):
+        for i in range(size):
+            experience = Experience.objects.create(title=f"Engineer {i}", organisation="Acme", included=i % 2 == 0)
+            project = Project.objects.create(name=f"Project {i}", tools="Python", included=i % 2 == 0)
+            for j in range(3):
+                experience.descriptions.add(Description.objects.create(content=f"experience {i} bullet {j}"))
+                project.descriptions.add(Description.objects.create(content=f"project {i} bullet {j}"))
+            Education.objects.create(school=f"School {i}", major="CS", location="Toronto")
+            Skill.objects.create(content=f"Skill {i}")
+
+
+class LoadResumeContentTests(ResumeLibraryTestCase):
+    def test_query_count_does_not_grow_with_library(self):
+        self.create_library(2)
+        with self.assertNumQueries(6):
+            load_resume_content({"name": "Jake"})
+
+        self.create_library(20)
+        with self.assertNumQueries(6):
+            content = load_resume_content({"name": "Jake"})
+        self.assertEqual(len(content["experiences"]), 11)
+
+    def test_only_included_rows_are_loaded(self):
+        self.create_library(4)
+        content = load_resume_content({"name": "Jake"})
+
+        self.assertEqual(content["personal_info"], {"name": "Jake"})
+        self.assertTrue(all(experience["included"] for experience in content["experiences"]))
+        self.assertTrue(all(project["included"] for project in content["projects"]))
+        self.assertEqual([len(project["descriptions"]) for project in content["projects"]], [3, 3])
+        self.assertEqual(len(content["education"]), 4)
+        self.assertEqual(len(content["skills"]), 4)
+
+    def test_create_resume_from_database(self):
+        self.create_library(2)
+        with mock.patch("resume.views.compile_data_to_latex") as compile_data_to_latex:
+            response = self.client.post(
+                "/create-resume/?source=db",
+                {"personal_info": {"name": "Jake"}},
+                content_type="application/json",
+            )
+
+        self.assertEqual(response.status_code, 204)
+        content = compile_data_to_latex.call_args.args[0]
+        self.assertEqual(content["personal_info"], {"name": "Jake"})
+        self.assertEqual([experience["title"] for experience in content["experiences"]], ["Engineer 0"])
+
+
+    def test_malformed_bodies_are_rejected(self):
+        for query, body in (("?source=db", ["Jake"]), ("", ["Jake"]), ("?source=db", {"personal_info": "Jake"})):
+            response = self.client.post(f"/create-resume/{query}", body, content_type="application/json")
+            self.assertEqual(response.status_code, 400)
+
+
+class ResumeDataEndpointTests(ResumeLibraryTestCase):
+    def test_returns_every_section_in_constant_queries(self):
+        # four validator aggregates, then the six queries of load_resume_library
+        self.create_library(2)
+        with self.assertNumQueries(10):
+            self.client.get("/api/resume-data/")
+
+        self.create_library(20)
+        with self.assertNumQueries(10):
+            response = self.client.get("/api/resume-data/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["education"]), 22)
+        self.assertEqual(len(response.data["experiences"]), 22)
+        self.assertEqual(len(response.data["projects"][0]["descriptions"]), 3)
+        self.assertEqual(len(response.data["skills"]), 22)
+
+
+class DescriptionUpsertTests(TestCase):
+    def put_experience(self, experience, bullets):
+        return self.client.put(
+            f"/api/experiences/{experience.id}/",
+            {"title": "Engineer", "organisation": "Acme", "descriptions": [{"content": bullet} for bullet in bullets]},
+            content_type="application/json",
+        )
+
+    def test_update_query_count_does_not_grow_with_bullets(self):
+        small = Experience.objects.create(title="Engineer", organisation="Acme")
+        large = Experience.objects.create(title="Engineer", organisation="Acme")
+        self.put_experience(small, ["a", "b"])
+        self.put_experience(large, [f"bullet {i}" for i in range(40)])
+
+        with CaptureQueriesContext(connection) as small_queries:
+            self.put_experience(small, ["a", "c", "d"])
+        with CaptureQueriesContext(connection) as large_queries:
+            self.put_experience(large, [f"bullet {i}" for i in range(20, 60)])
+        self.assertEqual(len(small_queries), len(large_queries))
+
+    def test_reuses_rows_and_only_changes_the_diff(self):
+        experience = Experience.objects.create(title="Engineer", organisation="Acme")
+        shared = Description.objects.create(content="Shipped it")
+        Project.objects.create(name="Side project").descriptions.add(shared)
+
+        response = self.put_experience(experience, ["Shipped it", "Fixed it"])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(desc["content"] for desc in response.data["descriptions"]), ["Fixed it", "Shipped it"])
+        self.assertIn(shared, experience.descriptions.all())
+        self.assertEqual(Description.objects.filter(content="Shipped it").count(), 1)
+
+        fixed = Description.objects.get(content="Fixed it")
+        self.assertEqual(fixed.content_hash, Description.hash_content("Fixed it"))
+
+        self.put_experience(experience, ["Fixed it"])
+        self.assertEqual(list(experience.descriptions.all()), [fixed])
+
+
+class BulkUpdateTests(TestCase):
+    def test_toggles_included_in_one_request(self):
+        projects = [Project.objects.create(name=f"Project {i}") for i in range(30)]
+        for project in projects:
+            project.descriptions.add(Description.objects.create(content=f"{project.name} bullet"))
+        changes = [{"id": project.id, "included": True} for project in projects]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch("/api/projects/bulk/", changes, content_type="application/json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(queries), 10)
+        self.assertEqual(Project.objects.filter(included=True).count(), 30)
+        self.assertTrue(all(len(project["descriptions"]) == 1 for project in response.data))
+
+    def test_unknown_ids_change_nothing(self):
+        experience = Experience.objects.create(title="Engineer", organisation="Acme")
+        response = self.client.patch(
+            "/api/experiences/bulk/",
+            [{"id": experience.id, "included": True}, {"id": 999, "included": True}],
+            content_type="application/json",
+        )
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data["ids"], [999])
+        experience.refresh_from_db()
+        self.assertFalse(experience.included)
+
+    def test_ids_are_converted_or_rejected(self):
+        experience = Experience.objects.create(title="Engineer", organisation="Acme", included=False)
+        for bad_id in ("abc", [1]):
+            response = self.client.patch("/api/experiences/bulk/", [{"id": bad_id, "included": True}], content_type="application/json")
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data["ids"], [bad_id])
+
+        response = self.client.patch("/api/experiences/bulk/", [{"id": str(experience.id), "included": True}], content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        experience.refresh_from_db()
+        self.assertTrue(experience.included)
+
+
+class ConditionalGetTests(ResumeLibraryTestCase):
+    @override_settings(RESUME_RESPONSE_CACHE_ENABLED=True)
+    def test_unchanged_list_is_not_modified(self):
+        self.create_library(3)
+        response = self.client.get("/api/experiences/")
+        self.assertEqual(response.status_code, 200)
+
+        # answered from the response cache
+        with self.assertNumQueries(0):
+            not_modified = self.client.get("/api/experiences/", HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified["ETag"], response["ETag"])
+
+    def test_edits_and_deletes_change_the_etag(self):
+        self.create_library(3)
+        etag = self.client.get("/api/resume-data/")["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.first().delete()
+        response = self.client.get("/api/resume-data/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response["ETag"]
+        experience = Experience.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch("/api/experiences/bulk/", [{"id": experience.id, "included": not experience.included}], content_type="application/json")
+        self.assertEqual(self.client.get("/api/resume-data/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_detail_uses_the_row_validators(self):
+        self.create_library(1)
+        project = Project.objects.first()
+        etag = self.client.get(f"/api/projects/{project.id}/")["ETag"]
+        self.assertEqual(self.client.get(f"/api/projects/{project.id}/", HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Description.objects.filter(project=project).first().save()
+        self.assertEqual(self.client.get(f"/api/projects/{project.id}/", HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get("/api/projects/999/").status_code, 404)
+        for section in ("education", "experiences", "projects", "skills"):
+            self.assertEqual(self.client.get(f"/api/{section}/abc/").status_code, 404)
+
+    def test_deleted_and_unlinked_descriptions_change_the_validators(self):
+        self.create_library(2)
+        experience = Experience.objects.first()
+        list_etag = self.client.get("/api/experiences/")["ETag"]
+        detail = self.client.get(f"/api/experiences/{experience.id}/")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            experience.descriptions.first().delete()
+        self.assertEqual(self.client.get("/api/experiences/", HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+        response = self.client.get(f"/api/experiences/{experience.id}/", HTTP_IF_NONE_MATCH=detail["ETag"], HTTP_IF_MODIFIED_SINCE=detail["Last-Modified"])
+        self.assertEqual(response.status_code, 200)
+
+        list_etag = self.client.get("/api/experiences/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            experience.descriptions.remove(experience.descriptions.first())
+        self.assertEqual(self.client.get("/api/experiences/", HTTP_IF_NONE_MATCH=list_etag).status_code, 200)
+
+    def test_lists_only_send_an_etag(self):
+        # a deleted row only lowers the count, which If-Modified-Since cannot see
+        self.create_library(1)
+        response = self.client.get("/api/experiences/")
+        self.assertIn("ETag", response)
+        self.assertNotIn("Last-Modified", response)
+        self.assertNotIn("Last-Modified", self.client.get("/api/resume-data/"))
+
+
+class LargeListTests(ResumeLibraryTestCase):
+    def test_cursor_pagination_is_opt_in(self):
+        self.create_library(5)
+        self.assertEqual(len(self.client.get("/api/projects/").data), 5)
+
+        names = []
+        response = self.client.get("/api/projects/?page_size=2")
+        while True:
+            names += [project["name"] for project in response.data["results"]]
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(names, [f"Project {i}" for i in range(5)])
+
+    def test_stream_matches_the_regular_list(self):
+        self.create_library(7)
+        expected = self.client.get("/api/experiences/").json()
+
+        with self.settings(RESUME_API_STREAM_CHUNK_SIZE=3):
+            response = self.client.get("/api/experiences/?stream=1")
+            body = b"".join(response.streaming_content)
+        self.assertEqual(json.loads(body), expected)
+        self.assertEqual(len(expected), 7)
+
+
+@override_settings(RESUME_RESPONSE_CACHE_ENABLED=True)
+class ResponseCacheTests(ResumeLibraryTestCase):
+    def test_hits_skip_the_database_until_a_write(self):
+        self.create_library(3)
+        first = self.client.get("/api/projects/")
+        with self.assertNumQueries(0):
+            second = self.client.get("/api/projects/")
+        self.assertEqual((first["X-Cache"], second["X-Cache"]), ("MISS", "HIT"))
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(response_cache.stats()["hits"], 1)
+
+        project = Project.objects.first()
+        with self.captureOnCommitCallbacks(execute=True):
+            project.descriptions.add(Description.objects.create(content="New bullet"))
+        response = self.client.get("/api/projects/")
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertIn("New bullet", response.content.decode())
+
+        # other sections keep their entries
+        self.client.get("/api/skills/")
+        with self.captureOnCommitCallbacks(execute=True):
+            Project.objects.first().delete()
+        self.assertEqual(self.client.get("/api/skills/")["X-Cache"], "HIT")
+        self.assertEqual(self.client.get("/api/resume-data/")["X-Cache"], "MISS")
+
+    def test_every_invalidation_gets_a_new_generation(self):
+        keys = [response_cache.key((EXPERIENCES_SECTION,), "/api/experiences/")]
+        with mock.patch.object(response_cache.cache, "incr", side_effect=AssertionError("incr is not atomic")):
+            for _ in range(3):
+                response_cache.invalidate(EXPERIENCES_SECTION)
+                keys.append(response_cache.key((EXPERIENCES_SECTION,), "/api/experiences/"))
+        self.assertEqual(len(set(keys)), 4)
+
+    @override_settings(RESUME_RESPONSE_CACHE_ENABLED=False)
+    def test_disabled_cache_reads_the_database(self):
+        self.create_library(1)
+        self.client.get("/api/projects/")
+        response = self.client.get("/api/projects/")
+        self.assertNotIn("X-Cache", response)
+        self.assertEqual(response_cache.stats()["hits"], 0)
+
+
+class StreamedResumeTests(ResumeLibraryTestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = MemoryStorage({BASE_TEMPLATE_KEY: "\n".join(RESUME_MARKERS)})
+        set_storage(self.storage)
+        self.addCleanup(set_storage, None)
+
+    def post_stream(self, query=""):
+        return self.client.post(
+            f"/create-resume/?source=db&mode=stream{query}",
+            {"personal_info": {"name": "Jake", "number": "555", "email": "jake@example.com"}},
+            content_type="application/json",
+        )
+
+    def test_returns_pdf_and_stores_it_in_background(self):
+        self.create_library(2)
+        with self.settings(RESUME_PDF_CACHE_ENABLED=False), \
+                mock.patch("resume.utils.compile_latex_to_pdf", return_value=b"%PDF-1.5 fake"), \
+                mock.patch("resume.utils.run_in_background", side_effect=lambda func, *args: func(*args)) as run_in_background:
+            response = self.post_stream()
+            skipped = self.post_stream("&upload=skip")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(response.content, b"%PDF-1.5 fake")
+        self.assertEqual(run_in_background.call_count, 1)
+        key = response["X-Resume-Url"].removeprefix("memory://")
+        self.assertTrue(key.startswith("media-resume/output/resume-"))
+        self.assertEqual(self.storage.files[key], b"%PDF-1.5 fake")
+
+        self.assertEqual(skipped.content, b"%PDF-1.5 fake")
+        self.assertNotIn("X-Resume-Url", skipped)
+
+    def test_sync_render_uses_the_configured_storage(self):
+        self.create_library(1)
+        with mock.patch("resume.utils.compile_latex_to_pdf", return_value=b"%PDF-1.5 fake"), \
+                self.settings(RESUME_PDF_CACHE_DIR=self.enterContext(tempfile.TemporaryDirectory())):
+            url = compile_data_to_latex(load_resume_content({"name": "Jake", "number": "555", "email": "jake@example.com"}))
+        self.assertTrue(url.startswith("memory://media-resume/output/"))
+        self.assertIn(url.removeprefix("memory://"), self.storage.files)
+
+    def test_reports_stage_timings(self):
+        stage_metrics.clear()
+        self.create_library(2)
+        with self.settings(RESUME_PDF_CACHE_ENABLED=False), \
+                mock.patch("resume.utils.compile_latex_to_pdf", return_value=b"%PDF-1.5 fake"):
+            response = self.post_stream("&upload=skip")
+
+        stages = [entry.split(";")[0] for entry in response["Server-Timing"].split(", ")]
+        self.assertEqual(stages, ["sections", "template_get", "template_fill"])
+        self.assertEqual(stage_metrics.snapshot()["sections"]["count"], 1)
+
+        metrics = self.client.get("/metrics").content.decode()
+        self.assertIn('resume_render_stage_seconds_count{stage="template_fill"} 1', metrics)
+        self.assertIn('resume_render_stage_seconds_bucket{stage="sections",le="+Inf"} 1', metrics)
+        self.assertIn('resume_render_stage_recent_seconds{stage="sections",quantile="0.99"}', metrics)
+        self.assertIn("resume_s3_http_requests_total ", metrics)
+
+
+class DraftPreviewTests(ResumeLibraryTestCase):
+    def test_draft_is_rendered_without_pdflatex(self):
+        self.create_library(3)
+        with mock.patch("resume.utils.compile_latex_to_pdf") as compile_latex_to_pdf:
+            response = self.client.post(
+                "/create-resume/?source=db&mode=draft",
+                {"personal_info": {"name": "Jake (Draft)", "number": "555", "email": "jake@example.com"}},
+                content_type="application/json",
+            )
+
+        compile_latex_to_pdf.assert_not_called()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertTrue(response.content.startswith(b"%PDF-1.4"))
+        self.assertTrue(response.content.endswith(b"%%EOF\n"))
+
+    def test_null_and_numeric_personal_info(self):
+        pdf = render_draft_pdf({"personal_info": {"name": None, "number": 5551234, "email": None}})
+        stream = pdf.split(b"stream\n", 1)[1].split(b"\nendstream", 1)[0]
+        self.assertIn(b"(5551234)", zlib.decompress(stream))
+        self.assertTrue(render_draft_pdf({"personal_info": None}).startswith(b"%PDF-1.4"))
+
+    def test_long_resumes_break_into_pages(self):
+        experience = {"included": True, "title": "Engineer", "organisation": "Acme", "descriptions": ["Shipped (a lot of) things " * 8] * 5}
+        pdf = render_draft_pdf({"personal_info": {"name": "Jake"}, "experiences": [experience] * 20})
+        self.assertGreater(pdf.count(b"/Type /Page "), 1)
+        self.assertIn(b"/Count", pdf)
+
+
+class BatchRenderTests(ResumeLibraryTestCase):
+    def test_manifest_variants_pick_rows_from_one_snapshot(self):
+        self.create_library(3)
+        experience_ids = list(Experience.objects.order_by("id").values_list("id", flat=True))
+        manifest = {
+            "personal_info": {"name": "Jake", "email": "jake@example.com"},
+            "variants": [
+                {"name": "Backend Roles", "experiences": experience_ids[1:], "skills": []},
+                {"name": "default", "personal_info": {"name": "Jake R"}},
+            ],
+        }
+        with tempfile.NamedTemporaryFile("w", suffix=".json") as manifest_file:
+            json.dump(manifest, manifest_file)
+            manifest_file.flush()
+            backend, default = load_manifest(manifest_file.name)
+
+        self.assertEqual(backend["name"], "backend-roles")
+        self.assertEqual(default["personal_info"], {"name": "Jake R", "email": "jake@example.com"})
+
+        library = load_resume_library()
+        content = variant_content(library, backend)
+        self.assertEqual([experience["id"] for experience in content["experiences"] if experience["included"]], experience_ids[1:])
+        self.assertEqual(content["skills"], [])
+        self.assertEqual(variant_content(library, default)["experiences"], library["experiences"])
+
+
+class CompileAdmissionTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch("resume.workspace._semaphore", threading.BoundedSemaphore(1))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_sheds_load_once_the_queue_is_full(self):
+        with compile_slot():
+            with self.settings(RESUME_COMPILE_QUEUE_SIZE=0), self.assertRaises(CompileQueueFull):
+                with compile_slot():
+                    pass
+            with self.settings(RESUME_COMPILE_QUEUE_SIZE=1, RESUME_COMPILE_QUEUE_TIMEOUT=0.05), self.assertRaises(CompileQueueTimeout):
+                with compile_slot():
+                    pass
+        with compile_slot():
+            pass
+
+    def test_rejected_compiles_ask_the_client_to_retry(self):
+        rejected = CompileQueueFull("busy", retry_after=7)
+        with mock.patch("resume.views.compile_data_to_latex", side_effect=rejected):
+            response = self.client.post("/create-resume/", {}, content_type="application/json")
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response["Retry-After"], "7")
+
+    def test_pdflatex_runs_are_limited(self):
+        with self.assertRaises(subprocess.TimeoutExpired):
+            run_limited(["sleep", "5"], timeout=0.2)
+        # without the prlimit command the limits land just after start, give them a moment
+        with self.settings(RESUME_COMPILE_CPU_SECONDS=3, RESUME_COMPILE_MEMORY_MB=1024):
+            result = run_limited(["sh", "-c", "sleep 0.2; ulimit -t; ulimit -v"], text=True)
+        self.assertEqual(result.stdout.split(), ["3", str(1024 * 1024)])
+
+    @skipUnless(shutil.which("prlimit"), "needs the prlimit command")
+    def test_limits_are_in_place_before_exec(self):
+        with self.settings(RESUME_COMPILE_CPU_SECONDS=3):
+            result = run_limited(["sh", "-c", "ulimit -t"], text=True)
+        self.assertEqual(result.stdout.strip(), "3")
+        with self.assertRaises(FileNotFoundError):
+            run_limited(["no-such-pdflatex"])
+
+
+class SqlitePragmaTests(TestCase):
+    def test_new_connections_get_the_configured_pragmas(self):
+        with connection.cursor() as cursor:
+            cursor.execute("PRAGMA busy_timeout")
+            original = cursor.fetchone()[0]
+            with self.settings(RESUME_SQLITE_PRAGMAS={"busy_timeout": 1234}):
+                apply_sqlite_pragmas(sender=type(connection), connection=connection)
+            cursor.execute("PRAGMA busy_timeout")
+            self.assertEqual(cursor.fetchone()[0], 1234)
+            cursor.execute(f"PRAGMA busy_timeout = {original}")
+
+
+class CountingStorage(MemoryStorage):
+    """
+    MemoryStorage that counts template reads and can fail or stall them on demand
+    """
+    def __init__(self, files=None):
+        super().__init__(files)
+        self.reads = 0
+        self.error = None
+        self.gate = None
+
+    def get_template(self, key, version=None):
+        self.reads += 1
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.error is not None:
+            raise self.error
+        return super().get_template(key, version)
+
+
+class TemplateCacheTests(TestCase):
+    def setUp(self):
+        self.storage = CountingStorage({BASE_TEMPLATE_KEY: "v1"})
+
+    def test_served_from_memory_within_the_ttl(self):
+        cache = TemplateCache(ttl=60)
+        self.assertEqual(cache.get_text(self.storage, BASE_TEMPLATE_KEY), "v1")
+        self.storage.files[BASE_TEMPLATE_KEY] = "v2"
+        self.assertEqual(cache.get_text(self.storage, BASE_TEMPLATE_KEY), "v1")
+        self.assertEqual(self.storage.reads, 1)
+
+    def test_revalidates_after_the_ttl(self):
+        cache = TemplateCache(ttl=0)
+        first = cache.get(self.storage, BASE_TEMPLATE_KEY)
+        # unchanged: the storage answers "not modified" and the same entry is kept
+        self.assertIs(cache.get(self.storage, BASE_TEMPLATE_KEY), first)
+        self.storage.files[BASE_TEMPLATE_KEY] = "v2"
+        self.assertEqual(cache.get_text(self.storage, BASE_TEMPLATE_KEY), "v2")
+        self.assertEqual(self.storage.reads, 3)
+
+    def test_slow_storage_serves_the_cached_copy(self):
+        cache = TemplateCache(ttl=0, revalidate_timeout=0.05)
+        cache.get(self.storage, BASE_TEMPLATE_KEY)
+        self.storage.files[BASE_TEMPLATE_KEY] = "v2"
+        self.storage.gate = threading.Event()
+        self.assertEqual(cache.get_text(self.storage, BASE_TEMPLATE_KEY), "v1")
+
+        # while that GET is stuck, later callers get the cached copy without waiting on it
+        started = time.monotonic()
+        for _ in range(3):
+            self.assertEqual(cache.get_text(self.storage, BASE_TEMPLATE_KEY), "v1")
+        self.assertLess(time.monotonic() - started, 0.05)
+        self.assertEqual(self.storage.reads, 2)
+
+        self.storage.gate.set()
+        self.storage.gate = None
+        # the background check finishes and its result is used from then on
+        deadline = time.monotonic() + 5
+        while cache.get_text(self.storage, BASE_TEMPLATE_KEY) != "v2" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(cache.get_text(self.storage, BASE_TEMPLATE_KEY), "v2")
+
+    def test_failed_revalidation_is_not_remembered(self):
+        cache = TemplateCache(ttl=0)
+        cache.get(self.storage, BASE_TEMPLATE_KEY)
+        self.storage.error = UnicodeDecodeError("utf-8", b"\xff", 0, 1, "invalid start byte")
+        self.assertEqual(cache.get_text(self.storage, BASE_TEMPLATE_KEY), "v1")
+        self.assertEqual(cache.get_text(self.storage, BASE_TEMPLATE_KEY), "v1")
+        self.assertEqual(self.storage.reads, 3)
+
+        self.storage.error = None
+        self.storage.files[BASE_TEMPLATE_KEY] = "v2"
+        self.assertEqual(cache.get_text(self.storage, BASE_TEMPLATE_KEY), "v2")
+
+
+class PdfCacheTests(TestCase):
+    content = {
+        "personal_info": {"name": "Jake", "number": "555", "email": "jake@example.com"},
+        "experiences": [], "projects": [], "education": [], "skills": [{"content": "Python"}],
+    }
+
+    def setUp(self):
+        self.directory = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(self.settings(RESUME_PDF_CACHE_DIR=self.directory, RESUME_PDF_CACHE_ENABLED=True))
+        self.storage = MemoryStorage({BASE_TEMPLATE_KEY: "\n".join(RESUME_MARKERS)})
+        self.compile = self.enterContext(mock.patch("resume.utils.compile_latex_to_pdf", return_value=b"%PDF-1.5 fake"))
+
+    def test_digest_covers_source_and_template_version(self):
+        digest = PdfCache.digest("source", "etag-1")
+        self.assertEqual(digest, PdfCache.digest("source", "etag-1"))
+        self.assertNotEqual(digest, PdfCache.digest("source", "etag-2"))
+        self.assertNotEqual(digest, PdfCache.digest("source!", "etag-1"))
+
+    def test_evicts_least_recently_used_past_max_bytes(self):
+        cache = PdfCache(directory=self.directory, max_bytes=25)
+        cache.put_local("a", b"a" * 10)
+        cache.put_local("b", b"b" * 10)
+        os.utime(os.path.join(self.directory, "a.pdf"), (1000, 1000))
+        os.utime(os.path.join(self.directory, "b.pdf"), (2000, 2000))
+        # reading a makes it the most recently used, so b is evicted instead
+        self.assertEqual(cache.get_local("a"), b"a" * 10)
+        cache.put_local("c", b"c" * 10)
+
+        self.assertIsNone(cache.get_local("b"))
+        self.assertEqual(cache.get_local("a"), b"a" * 10)
+        self.assertEqual(cache.get_local("c"), b"c" * 10)
+
+    def test_unchanged_resume_is_not_compiled_again(self):
+        first = render_resume_pdf(self.content, self.storage)
+        second = render_resume_pdf(self.content, self.storage)
+        self.assertEqual(self.compile.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(second[0], b"%PDF-1.5 fake")
+
+    def test_failed_local_cache_write_does_not_fail_the_render(self):
+        with mock.patch("resume.pdf_cache.os.replace", side_effect=OSError(28, "No space left on device")):
+            pdf_bytes, url = render_resume_pdf(self.content, self.storage, upload=UPLOAD_SKIP)
+        self.assertEqual(pdf_bytes, b"%PDF-1.5 fake")
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_pdf_stored_by_another_worker_is_not_downloaded(self):
+        latex_content, template_version = render_resume_latex(self.content, self.storage)
+        key = resume_pdf_key(PdfCache.digest(latex_content, template_version))
+        self.storage.put_pdf(key, b"%PDF-1.5 other worker")
+
+        self.assertEqual(render_resume_pdf(self.content, self.storage), (None, self.storage.url(key)))
+        self.compile.assert_not_called()
+
+    def test_sync_render_uploads_a_pdf_only_cached_locally(self):
+        pdf_bytes, url = render_resume_pdf(self.content, self.storage, upload=UPLOAD_SKIP)
+        self.assertIsNone(url)
+        self.assertFalse(any(key.endswith(".pdf") for key in self.storage.files))
+
+        pdf_bytes, url = render_resume_pdf(self.content, self.storage)
+        self.assertEqual(self.compile.call_count, 1)
+        self.assertEqual(self.storage.files[url.removeprefix("memory://")], pdf_bytes)
+
+
+class RenderJobTests(TestCase):
+    def post_async(self):
+        return self.client.post("/create-resume/?mode=async", {"personal_info": {"name": "Jake"}}, content_type="application/json")
+
+    def test_queues_a_job_and_reports_its_status(self):
+        with mock.patch("resume.jobs._get_executor") as get_executor, mock.patch("resume.jobs._pending", 0):
+            response = self.post_async()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data["status"], RenderJob.PENDING)
+        self.assertEqual(get_executor.return_value.submit.call_count, 1)
+        job_id = response.data["id"]
+        self.assertEqual(self.client.get(f"/render-jobs/{job_id}/").data["status"], RenderJob.PENDING)
+        self.assertEqual(self.client.get(f"/render-jobs/{job_id}/pdf/").status_code, 409)
+
+    def test_full_queue_asks_the_client_to_retry(self):
+        with self.settings(RESUME_RENDER_QUEUE_SIZE=0):
+            response = self.post_async()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("Retry-After", response)
+        self.assertFalse(RenderJob.objects.exists())
+
+    def test_worker_records_the_outcome(self):
+        succeeded = RenderJob.objects.create()
+        failed = RenderJob.objects.create()
+        with mock.patch("resume.jobs._pending", 2), mock.patch("resume.jobs.close_old_connections"):
+            _run_job(succeeded.id, {}, None, lambda content, storage: "https://bucket.s3.amazonaws.com/resume.pdf")
+            _run_job(failed.id, {}, None, mock.Mock(side_effect=RuntimeError("boom")))
+
+        succeeded.refresh_from_db()
+        failed.refresh_from_db()
+        self.assertEqual(succeeded.status, RenderJob.SUCCEEDED)
+        self.assertIsNotNone(succeeded.finished_at)
+        self.assertEqual(failed.status, RenderJob.FAILED)
+
+    def test_pdf_endpoint_follows_the_job(self):
+        web = RenderJob.objects.create(status=RenderJob.SUCCEEDED, pdf_url="https://bucket.s3.amazonaws.com/resume.pdf")
+        memory = RenderJob.objects.create(status=RenderJob.SUCCEEDED, pdf_url="memory://media-resume/output/resume.pdf")
+        failed = RenderJob.objects.create(status=RenderJob.FAILED, error="Resume could not be compiled.")
+
+        response = self.client.get(f"/render-jobs/{web.id}/pdf/")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], web.pdf_url)
+        response = self.client.get(f"/render-jobs/{memory.id}/pdf/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["pdf_url"], memory.pdf_url)
+        local = RenderJob.objects.create(status=RenderJob.SUCCEEDED, pdf_url="/resume-files/media-resume/output/resume.pdf")
+        response = self.client.get(f"/render-jobs/{local.id}/pdf/")
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response["Location"], local.pdf_url)
+        response = self.client.get(f"/render-jobs/{failed.id}/pdf/")
+        self.assertEqual(response.status_code, 410)
+        self.assertEqual(response.data["error"], failed.error)
+
+
+# stands in for pdflatex: logs each run to $STUB_LOG and fails the kinds of run listed in $STUB_FAIL
+STUB_PDFLATEX = """#!{python}
+import os, sys, time
+args = sys.argv[1:]
+kind = "ini" if "-ini" in args else "cold" if any(arg.endswith(".tex") for arg in args) else "warm"
+with open(os.environ["STUB_LOG"], "a") as log:
+    log.write(kind + "\\n")
+if kind == "warm":
+    sys.stdin.readline()
+if kind in os.environ.get("STUB_HANG", ""):
+    time.sleep(30)
+if kind in os.environ.get("STUB_FAIL", "").split(","):
+    sys.exit(1)
+job = [arg.split("=", 1)[1] for arg in args if arg.startswith("-jobname=")]
+name = job[0] if job else [arg for arg in args if arg.endswith(".tex")][0][:-4]
+with open(name + (".fmt" if kind == "ini" else ".pdf"), "wb") as out:
+    out.write(b"%PDF-" + kind.encode())
+"""
+
+
+class StubPdflatexTestCase(TestCase):
+    """
+    Puts STUB_PDFLATEX first on PATH and gives the LaTeX engine and compiles throwaway directories
+    """
+    def setUp(self):
+        folder = self.enterContext(tempfile.TemporaryDirectory())
+        bin_dir = os.path.join(folder, "bin")
+        os.makedirs(bin_dir)
+        stub = os.path.join(bin_dir, "pdflatex")
+        with open(stub, "w") as stub_file:
+            stub_file.write(STUB_PDFLATEX.format(python=sys.executable))
+        os.chmod(stub, 0o755)
+
+        self.log = os.path.join(folder, "runs.log")
+        self.enterContext(mock.patch.dict(os.environ, {"PATH": bin_dir + os.pathsep + os.environ["PATH"], "STUB_LOG": self.log}))
+        self.enterContext(self.settings(RESUME_COMPILE_WORKSPACE_ROOT=os.path.join(folder, "work")))
+        self.engine = LatexEngine(fmt_dir=os.path.join(folder, "fmt"), pool_size=0)
+        self.enterContext(mock.patch("resume.utils.latex_engine", self.engine))
+        self.addCleanup(self.engine.shutdown)
+
+    def runs(self):
+        if not os.path.exists(self.log):
+            return []
+        with open(self.log) as log:
+            return log.read().split()
+
+
+class WarmLatexEngineTests(StubPdflatexTestCase):
+    document = "\\documentclass{article}\n\\begin{document}Jake\\end{document}"
+
+    def compile(self, **environ):
+        with mock.patch.dict(os.environ, environ), self.settings(RESUME_LATEX_ENGINE="warm"):
+            return compile_latex_to_pdf(self.document)
+
+    def test_format_is_dumped_once(self):
+        self.assertEqual(self.compile(), b"%PDF-warm")
+        self.assertEqual(self.compile(), b"%PDF-warm")
+        self.assertEqual(self.runs(), ["ini", "warm", "warm"])
+
+    def test_failed_format_dump_is_remembered(self):
+        for _ in range(3):
+            self.assertEqual(self.compile(STUB_FAIL="ini"), b"%PDF-cold")
+        self.assertEqual(self.runs(), ["ini", "cold", "cold", "cold"])
+
+    def test_broken_document_is_not_compiled_again_cold(self):
+        self.assertIsNone(self.compile(STUB_FAIL="warm"))
+        self.assertEqual(self.runs(), ["ini", "warm"])
+
+    def test_warm_timeout_stops_the_render(self):
+        started = time.monotonic()
+        with self.settings(RESUME_COMPILE_TIMEOUT=1):
+            self.assertIsNone(self.compile(STUB_HANG="warm"))
+        # one timeout, no second cold run of the same document
+        self.assertLess(time.monotonic() - started, 1.8)
+        self.assertEqual(self.runs(), ["ini", "warm"])
+
+    def test_format_dump_does_not_hold_the_engine_lock(self):
+        def dump(*args, **kwargs):
+            # other renders need the engine lock for their process pools while this runs
+            self.assertFalse(self.engine._lock.locked())
+            return run_limited(*args, **kwargs)
+
+        with mock.patch("resume.latex_engine.run_limited", side_effect=dump) as run:
+            self.assertEqual(self.compile(), b"%PDF-warm")
+        self.assertEqual(run.call_count, 1)
+
+    def test_concurrent_refills_do_not_overfill_the_pool(self):
+        class SlowProcess:
+            def __init__(self, fmt_name, env):
+                time.sleep(0.05)
+
+            def discard(self):
+                pass
+
+        engine = LatexEngine(fmt_dir=self.engine.fmt_dir, pool_size=1)
+        with mock.patch("resume.latex_engine._WarmProcess", SlowProcess):
+            threads = [threading.Thread(target=engine._refill, args=("resume-test",)) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(engine._pool("resume-test").qsize(), 1)
+            engine.shutdown()
+
+    def test_cold_is_the_default(self):
+        self.assertEqual(compile_latex_to_pdf(self.document), b"%PDF-cold")
+        self.assertEqual(self.runs(), ["cold"])
+
+
+class CompileWorkspaceTests(TestCase):
+    def setUp(self):
+        self.root = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(self.settings(RESUME_COMPILE_WORKSPACE_ROOT=self.root))
+        self.enterContext(mock.patch("resume.workspace._swept_roots", set()))
+
+    def test_sweep_removes_stale_workspaces_of_dead_processes(self):
+        finished = subprocess.Popen(["true"])
+        finished.wait()
+        live, dead = f"warm-{os.getpid()}-idle", f"warm-{finished.pid}-crashed"
+        for name in ("compile-stale", "compile-fresh", live, dead, f"warm-{finished.pid}-fresh"):
+            os.makedirs(os.path.join(self.root, name))
+        for name in ("compile-stale", live, dead):
+            os.utime(os.path.join(self.root, name), (1000, 1000))
+
+        compile_root()
+        self.assertEqual(sorted(os.listdir(self.root)), sorted(["compile-fresh", live, f"warm-{finished.pid}-fresh"]))
+
+    def test_workspace_is_removed_even_when_the_compile_fails(self):
+        with self.assertRaises(RuntimeError):
+            with compile_workspace() as workspace:
+                open(os.path.join(workspace, "resume.tex"), "w").close()
+                raise RuntimeError("pdflatex crashed")
+        self.assertFalse(os.path.exists(workspace))
+
+    def test_concurrent_compiles_are_capped(self):
+        with mock.patch("resume.workspace._semaphore", None), \
+                self.settings(RESUME_MAX_CONCURRENT_COMPILES=2, RESUME_COMPILE_QUEUE_SIZE=0):
+            with compile_slot(), compile_slot():
+                with self.assertRaises(CompileQueueFull):
+                    with compile_slot():
+                        pass
+            with compile_slot():
+                pass
+
+
+class EscapeLatexTests(TestCase):
+    def test_special_characters(self):
+        self.assertEqual(escape_latex("R&D 100% $5 #1 a_b {x} ~"), r"R\&D 100\% \$5 \#1 a\_b \{x\} \textasciitilde{}")
+
+    def test_backslash_is_escaped(self):
+        self.assertEqual(escape_latex("C:\\Users"), r"C:\textbackslash{}Users")
+
+    def test_replacements_are_not_escaped_again(self):
+        # the braces added for ^ and \ must stay plain braces
+        self.assertEqual(escape_latex("x^2"), r"x\textasciicircum{}2")
+        self.assertEqual(escape_latex("\\^"), r"\textbackslash{}\textasciicircum{}")
+
+    def test_smart_quotes_become_plain_quotes(self):
+        self.assertEqual(escape_latex("\u201cfast\u201d and \u2018lean\u2019"), "\"fast\" and 'lean'")
+
+    def test_non_strings_and_batches(self):
+        self.assertEqual(escape_latex(3.5), "3.5")
+        self.assertEqual(escape_latex_many(["a&b", "plain"]), [r"a\&b", "plain"])
+
+
+class ParsedTemplateTests(TestCase):
+    def test_strict_template_needs_every_marker(self):
+        with self.assertRaises(TemplateError) as raised:
+            ParsedTemplate(f"{PERSONAL_INFO_MARKER}\n{SKILLS_MARKER}")
+        self.assertIn(EXPERIENCES_MARKER, str(raised.exception))
+
+        lenient = ParsedTemplate(f"{SKILLS_MARKER}", strict=False)
+        self.assertIn(EXPERIENCES_MARKER, lenient.missing)
+
+    def test_repeated_markers_are_all_filled(self):
+        template = ParsedTemplate(f"a {SKILLS_MARKER} b {SKILLS_MARKER} c", markers=[SKILLS_MARKER])
+        self.assertEqual(template.render({SKILLS_MARKER: "X"}), "a X b X c")
+
+    def test_blank_sections_leave_the_marker(self):
+        template = ParsedTemplate(f"[{SKILLS_MARKER}][{PROJECTS_MARKER}]", markers=[SKILLS_MARKER, PROJECTS_MARKER])
+        self.assertEqual(template.render({SKILLS_MARKER: "  \n", PROJECTS_MARKER: "P"}), f"[{SKILLS_MARKER}][P]")
+        self.assertEqual(template.render({}), f"[{SKILLS_MARKER}][{PROJECTS_MARKER}]")
+
+
+class FragmentInvalidationTests(TestCase):
+    def setUp(self):
+        fragment_cache.clear()
+        self.bullet = Description.objects.create(content="Shipped it")
+        self.experience = Experience.objects.create(title="Engineer", organisation="Acme")
+        self.other = Experience.objects.create(title="Intern", organisation="Acme")
+        self.project = Project.objects.create(name="Resume builder", tools="Django")
+        self.education = Education.objects.create(school="U of T", major="CS", location="Toronto")
+
+    def prime(self, *rows):
+        for label, row in rows:
+            fragment_cache.render(label, row.pk, "v1", lambda: "cached")
+
+    def cached(self, label, row):
+        return fragment_cache.render(label, row.pk, "v1", lambda: "rendered") == "cached"
+
+    def test_row_save_and_delete(self):
+        self.prime((EXPERIENCE, self.experience), (EXPERIENCE, self.other), (EDUCATION, self.education))
+        self.experience.title = "Senior Engineer"
+        self.experience.save()
+        self.education.delete()
+
+        self.assertFalse(self.cached(EXPERIENCE, self.experience))
+        self.assertTrue(self.cached(EXPERIENCE, self.other))
+        self.assertFalse(self.cached(EDUCATION, self.education))
+
+    def test_descriptions_changed_from_the_owner(self):
+        for change in (lambda: self.experience.descriptions.add(self.bullet),
+                       lambda: self.experience.descriptions.remove(self.bullet),
+                       lambda: self.experience.descriptions.clear()):
+            self.prime((EXPERIENCE, self.experience), (EXPERIENCE, self.other))
+            change()
+            self.assertFalse(self.cached(EXPERIENCE, self.experience))
+            self.assertTrue(self.cached(EXPERIENCE, self.other))
+
+    def test_descriptions_changed_from_the_bullet(self):
+        self.prime((EXPERIENCE, self.experience), (EXPERIENCE, self.other), (PROJECT, self.project))
+        self.bullet.experience_set.add(self.experience)
+        self.bullet.project_set.add(self.project)
+        self.assertFalse(self.cached(EXPERIENCE, self.experience))
+        self.assertTrue(self.cached(EXPERIENCE, self.other))
+        self.assertFalse(self.cached(PROJECT, self.project))
+
+        self.prime((EXPERIENCE, self.experience), (EXPERIENCE, self.other))
+        self.bullet.experience_set.remove(self.experience)
+        self.assertFalse(self.cached(EXPERIENCE, self.experience))
+
+        self.prime((EXPERIENCE, self.experience), (EXPERIENCE, self.other))
+        self.bullet.experience_set.clear()
+        # the unlinked owners are unknown by then, so every experience is dropped
+        self.assertFalse(self.cached(EXPERIENCE, self.experience))
+        self.assertFalse(self.cached(EXPERIENCE, self.other))
+
+    def test_edited_bullet_invalidates_everything_that_shows_it(self):
+        self.experience.descriptions.add(self.bullet)
+        self.project.descriptions.add(self.bullet)
+        self.prime((EXPERIENCE, self.experience), (EXPERIENCE, self.other), (PROJECT, self.project))
+
+        self.bullet.content = "Shipped it twice"
+        self.bullet.save()
+        self.assertFalse(self.cached(EXPERIENCE, self.experience))
+        self.assertTrue(self.cached(EXPERIENCE, self.other))
+        self.assertFalse(self.cached(PROJECT, self.project))
+
+        self.prime((EXPERIENCE, self.experience), (PROJECT, self.project))
+        self.bullet.delete()
+        self.assertFalse(self.cached(EXPERIENCE, self.experience))
+        self.assertFalse(self.cached(PROJECT, self.project))
+
+
+class LocalPdfTests(TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.root, ignore_errors=True)
+        self.storage = LocalStorage(self.root)
+        set_storage(self.storage)
+        self.addCleanup(set_storage, None)
+
+    def get(self, path):
+        return local_pdf(RequestFactory().get(f"/resume-files/{path}"), path)
+
+    def test_streams_the_stored_pdf(self):
+        self.storage.put_pdf("media-resume/output/a.pdf", b"%PDF-1.5 stored")
+        response = self.get("media-resume/output/a.pdf")
+        self.assertEqual(response["Content-Type"], "application/pdf")
+        self.assertEqual(b"".join(response.streaming_content), b"%PDF-1.5 stored")
+        response.close()
+
+    def test_route_covers_single_and_batch_pdfs(self):
+        for key in (resume_pdf_key("0123abcd"), f"{BATCH_OUTPUT_FOLDER}/backend.pdf"):
+            self.assertTrue(re.fullmatch(LOCAL_PDF_PATH, key), key)
+        self.assertIsNone(re.fullmatch(LOCAL_PDF_PATH, "latex_templates/base_template.tex"))
+
+    def test_missing_and_escaping_paths_are_not_found(self):
+        with self.assertRaises(Http404):
+            self.get("media-resume/output/missing.pdf")
+        with self.assertRaises(Http404):
+            self.get("media-resume/output/../../../etc/passwd.pdf")
+
+        set_storage(MemoryStorage())
+        with self.assertRaises(Http404):
+            self.get("media-resume/output/a.pdf")
+
+
+@override_settings(AWS_ACCESS_KEY_ID="test", AWS_SECRET_ACCESS_KEY="test", AWS_S3_REGION_NAME="us-east-1")
+class SharedS3ClientTests(TestCase):
+    def setUp(self):
+        reset_s3_client()
+        self.addCleanup(reset_s3_client)
+
+    def test_threads_and_compile_paths_share_one_client(self):
+        created = s3_pool_stats()["clients_created"]
+        clients = []
+        threads = [threading.Thread(target=lambda: clients.append(get_s3_client())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len({id(client) for client in clients}), 1)
+
+        stubber = self.enterContext(Stubber(clients[0]))
+        stubber.add_response("get_object", {"Body": StreamingBody(io.BytesIO(b"tex"), 3)}, {"Bucket": "bucket", "Key": "in.tex"})
+        stubber.add_response("put_object", {}, None)
+        stubber.add_response("put_object", {}, None)
+        with mock.patch("resume.utils.compile_latex_to_pdf", return_value=b"%PDF-1.5 fake"):
+            self.assertIsNotNone(compile_latex_to_s3("bucket", "in.tex", None))
+            self.assertIsNotNone(compile_latex_source("tex", "bucket", None, "resume"))
+        stubber.assert_no_pending_responses()
+        self.assertEqual(s3_pool_stats()["clients_created"] - created, 1)
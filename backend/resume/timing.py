@@ -0,0 +1,159 @@
+import bisect
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+
+# histogram bucket bounds in seconds, from a cached template GET up to a pdflatex timeout
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUANTILES = (0.5, 0.95, 0.99)
+
+# (stage, seconds) pairs recorded while the current request is handled, see ServerTimingMiddleware
+_request_timings = ContextVar("resume_request_timings", default=None)
+
+
+class StageHistogram:
+    def __init__(self, window):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+        # the most recent observations, quantiles are read from these
+        self.recent = deque(maxlen=window)
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+        self.recent.append(seconds)
+
+    def quantiles(self):
+        ordered = sorted(self.recent)
+        if not ordered:
+            return {}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in QUANTILES}
+
+
+class StageMetrics:
+    """
+    Aggregate timings of each render stage (template GET, section rendering, pdflatex, uploads...).
+
+    Every stage keeps a cumulative histogram for Prometheus and a window of its last
+    RESUME_METRICS_WINDOW timings for the p50/p95/p99 on the /metrics endpoint
+    """
+    def __init__(self, window=None):
+        self._window = window
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    @property
+    def window(self):
+        if self._window is not None:
+            return self._window
+        return getattr(settings, "RESUME_METRICS_WINDOW", 1024)
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = StageHistogram(self.window)
+            histogram.observe(seconds)
+
+    def snapshot(self):
+        """
+        {stage: {"count", "sum", "p50", "p95", "p99"}}
+        """
+        with self._lock:
+            stages = {stage: (histogram.count, histogram.total, histogram.quantiles()) for stage, histogram in self._stages.items()}
+        return {
+            stage: {"count": count, "sum": total, **{f"p{int(q * 100)}": value for q, value in quantiles.items()}}
+            for stage, (count, total, quantiles) in stages.items()
+        }
+
+    def prometheus_lines(self):
+        lines = [
+            "# HELP resume_render_stage_seconds Time spent in each resume render stage.",
+            "# TYPE resume_render_stage_seconds histogram",
+        ]
+        quantile_lines = [
+            f"# HELP resume_render_stage_recent_seconds Quantiles of the last {self.window} timings of each render stage.",
+            "# TYPE resume_render_stage_recent_seconds summary",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._stages.items()):
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'resume_render_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'resume_render_stage_seconds_sum{{stage="{stage}"}} {histogram.total}')
+                lines.append(f'resume_render_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+
+                for q, value in histogram.quantiles().items():
+                    quantile_lines.append(f'resume_render_stage_recent_seconds{{stage="{stage}",quantile="{q}"}} {value}')
+                quantile_lines.append(f'resume_render_stage_recent_seconds_sum{{stage="{stage}"}} {sum(histogram.recent)}')
+                quantile_lines.append(f'resume_render_stage_recent_seconds_count{{stage="{stage}"}} {len(histogram.recent)}')
+        return lines + quantile_lines
+
+    def clear(self):
+        with self._lock:
+            self._stages.clear()
+
+
+stage_metrics = StageMetrics()
+
+
+def record(stage, seconds):
+    """
+    Count a finished stage in the aggregate metrics and in the current request's Server-Timing
+    """
+    stage_metrics.observe(stage, seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.append((stage, seconds))
+
+
+@contextmanager
+def timed_stage(stage):
+    """
+    Time the block with a monotonic clock and record it under stage, even if it raises
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(stage, time.perf_counter() - started)
+
+
+def server_timing(timings):
+    """
+    Server-Timing header value, stages in the order they first ran, repeated stages summed
+    """
+    totals = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items())
+
+
+class ServerTimingMiddleware:
+    """
+    Collect the stages timed while a request is handled and report them in a Server-Timing
+    header, so the browser's network panel shows where a slow render spent its time.
+    Work handed to background threads (uploads) only shows up on /metrics
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "RESUME_SERVER_TIMING_ENABLED", True):
+            return self.get_response(request)
+
+        timings = []
+        token = _request_timings.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request_timings.reset(token)
+        if timings:
+            response["Server-Timing"] = server_timing(timings)
+        return response
@@ -1,6 +1,19 @@
-from django.urls import path
-from .views import CreateResumeViewSet
+from django.conf import settings
+from django.urls import path, re_path
+from .views import CreateResumeViewSet, RenderJobViewSet, local_pdf, metrics
+
+# single renders (resume_pdf_key) and render_resumes batches (batch.BATCH_OUTPUT_FOLDER)
+LOCAL_PDF_PATH = r"media-resume/(?:output|batch)/.+\.pdf"
 
 urlpatterns = [
-    path("create-resume/", CreateResumeViewSet.as_view({"post": "create_resume"}), name='create-resume')
-]
\ No newline at end of file
+    path("create-resume/", CreateResumeViewSet.as_view({"post": "create_resume"}), name='create-resume'),
+    path("render-jobs/<uuid:pk>/", RenderJobViewSet.as_view({"get": "retrieve"}), name='render-job'),
+    path("render-jobs/<uuid:pk>/pdf/", RenderJobViewSet.as_view({"get": "pdf"}), name='render-job-pdf'),
+    path("metrics", metrics, name='metrics'),
+]
+
+# with local storage the PDF URLs point back at this server (a front-end server should take these over in production)
+if settings.RESUME_STORAGE_BACKEND == "local":
+    urlpatterns.append(
+        re_path(rf"^{settings.RESUME_LOCAL_STORAGE_URL.strip('/')}/(?P<path>{LOCAL_PDF_PATH})$", local_pdf, name='local-pdf'),
+    )
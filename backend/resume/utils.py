@@ -1,431 +1,470 @@
 import subprocess
 import os
+import re
 import time
 import uuid
-import boto3
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from django.conf import settings
-from botocore.exceptions import NoCredentialsError
+from .s3 import get_s3_client
+from .storage import StorageError, S3Storage, get_storage
+from .template_cache import template_cache, BASE_TEMPLATE_KEY
+from .pdf_cache import pdf_cache
+from .latex_engine import LatexCompileError, latex_engine
+from .workspace import compile_slot, compile_workspace
+from .limits import compile_timeout, run_limited
+from .timing import timed_stage
+from .fragments import fragment_cache, EXPERIENCE, PROJECT, EDUCATION
+from .latex_template import (
+    PERSONAL_INFO_MARKER, EXPERIENCES_MARKER, EDUCATION_MARKER, PROJECTS_MARKER, SKILLS_MARKER,
+)
+
+# small pool for work that runs after the response is decided (e.g. archiving .tex files)
+_background_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="resume-background")
+
+
+# Every special character is matched by one compiled pattern, so each field is escaped in a
+# single pass. Backslash is included, and replacements are never re-scanned, so they can't be
+# escaped a second time (e.g. the braces in \textasciicircum{}).
+LATEX_ESCAPES = {
+    '\\': r'\textbackslash{}',
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '^': r'\textasciicircum{}',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '~': r'\textasciitilde{}',
+    # smart quotes become regular quotes
+    '\u201c': '"',
+    '\u201d': '"',
+    '\u2018': "'",
+    '\u2019': "'",
+}
+LATEX_ESCAPE_PATTERN = re.compile("[" + re.escape("".join(LATEX_ESCAPES)) + "]")
+
+
+def _escape_match(match):
+    return LATEX_ESCAPES[match[0]]
+
+
+@lru_cache(maxsize=4096)
+def _escape_str(text):
+    # most titles, dates and locations have nothing to escape
+    if LATEX_ESCAPE_PATTERN.search(text) is None:
+        return text
+    return LATEX_ESCAPE_PATTERN.sub(_escape_match, text)
 
 
 def escape_latex(text):
     """
-    Escape special LaTeX characters in text
+    Escape special LaTeX characters in text. Results are memoized, since the same
+    description bullets are shared across experiences and projects
     """
     if not isinstance(text, str):
         text = str(text)
-    
-    # Dictionary of LaTeX special characters and their escaped versions
-    latex_special_chars = {
-        '&': r'\&',
-        '%': r'\%',
-        '$': r'\$',
-        '#': r'\#',
-        '^': r'\textasciicircum{}',
-        '_': r'\_',
-        '{': r'\{',
-        '}': r'\}',
-        '~': r'\textasciitilde{}',
-    }
-    
-    # Replace special characters
-    for char, escaped in latex_special_chars.items():
-        text = text.replace(char, escaped)
-    
-    # Handle quotes (convert smart quotes to regular quotes)
-    text = text.replace('"', '"').replace('"', '"')  # Smart double quotes
-    text = text.replace(''', "'").replace(''', "'")  # Smart single quotes
-    
-    return text
+    return _escape_str(text)
 
 
-def compile_latex_to_s3(bucket_name, latex_key, folder, output_folder="media-resume/output"):
+def description_texts(descriptions):
     """
-    Download LaTeX file from S3, compile to PDF, upload PDF back to S3
+    Pull the text out of descriptions given either as strings or as {"content": ...} dicts
     """
-    # Generate unique filename to avoid conflicts
-    unique_id = str(uuid.uuid4())[:8]
-    timestamp = int(time.time())
-    
-    # Create temporary filenames
-    temp_latex_filename = f"temp_{unique_id}.tex"
-    temp_latex_path = os.path.join(folder, temp_latex_filename)
-    
-    # Expected PDF filename (what pdflatex will generate)
-    temp_pdf_filename = f"temp_{unique_id}.pdf"
-    generated_pdf_path = os.path.join(folder, temp_pdf_filename)
-
-    # Download LaTeX file from S3
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION_NAME
-    )
-    
-    try:
-        # Download LaTeX content from S3
-        s3_object = s3.get_object(Bucket=bucket_name, Key=latex_key)
-        latex_content = s3_object['Body'].read().decode('utf-8')
-        
-        # Write LaTeX content to temporary file
-        with open(temp_latex_path, 'w', encoding='utf-8') as temp_file:
-            temp_file.write(latex_content)
-
-        # Run pdflatex to generate the PDF
-        result = subprocess.run(
-            ["pdflatex", "-interaction=nonstopmode", temp_latex_filename],
-            cwd=folder,
-            capture_output=True,
-            text=True
-        )
-        
-        # Check if pdflatex succeeded
-        if result.returncode != 0:
-            print(f"pdflatex failed with return code {result.returncode}")
-            print(f"stderr: {result.stderr}")
-            print(f"stdout: {result.stdout}")
-            return None
+    return [desc.get("content", "") if isinstance(desc, dict) else desc for desc in descriptions]
 
-        # Check if PDF was actually generated
-        if not os.path.exists(generated_pdf_path):
-            print(f"PDF file was not generated at {generated_pdf_path}")
-            return None
-        
-        print("pdf is indeed generated")
-
-        # Generate S3 key for the PDF
-        original_filename = os.path.splitext(os.path.basename(latex_key))[0]
-        pdf_s3_key = f"{output_folder}/{original_filename}-{timestamp}.pdf"
-
-        # Upload PDF to S3
-        with open(generated_pdf_path, 'rb') as pdf_file:
-            s3.put_object(
-                Body=pdf_file, 
-                Bucket=bucket_name, 
-                Key=pdf_s3_key,
-                ContentType='application/pdf'
-            )
-            print("put object into s3")
-
-        # Clean up temporary files
-        cleanup_files = [
-            temp_latex_path,
-            generated_pdf_path,
-            os.path.join(folder, f"temp_{unique_id}.aux"),
-            os.path.join(folder, f"temp_{unique_id}.log"),
-        ]
-        
-        for file_path in cleanup_files:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-
-        print(f"https://{bucket_name}.s3.amazonaws.com/{pdf_s3_key}")
-        # Return the S3 URL for the PDF
-        return f"https://{bucket_name}.s3.amazonaws.com/{pdf_s3_key}"
+
+def escape_latex_many(values):
+    """
+    Escape a list of fields at once
+    """
+    return [escape_latex(value) for value in values]
+
+
+def compile_latex_to_pdf(latex_content, folder=None):
+    """
+    Compile LaTeX source held in memory and return the PDF bytes, or None on failure.
+    At most RESUME_MAX_CONCURRENT_COMPILES compiles run at once and a bounded queue waits for a
+    slot; beyond that CompileRejected is raised (see workspace.compile_slot)
+    """
+    with compile_slot(), timed_stage("pdflatex"):
+        if getattr(settings, "RESUME_LATEX_ENGINE", "cold") == "warm":
+            try:
+                pdf_bytes = latex_engine.compile(latex_content, timeout=compile_timeout())
+            except LatexCompileError as e:
+                # the document itself is broken (or hangs), compiling it again cold won't help
+                print(e)
+                return None
+            if pdf_bytes is not None:
+                return pdf_bytes
+            print("warm compile unavailable, falling back to a cold pdflatex run")
+        return compile_latex_cold(latex_content, folder)
+
+
+def compile_latex_cold(latex_content, folder=None):
+    """
+    Run a fresh pdflatex process on LaTeX source held in memory and return the PDF bytes.
+    Each run gets its own workspace directory (under folder if given) which is always removed
+    """
+    try:
+        with compile_workspace(parent=folder) as workspace:
+            # Write LaTeX content to a file in the private workspace
+            with open(os.path.join(workspace, "resume.tex"), 'w', encoding='utf-8') as temp_file:
+                temp_file.write(latex_content)
+
+            # Run pdflatex to generate the PDF, killed after RESUME_COMPILE_TIMEOUT seconds
+            try:
+                result = run_limited(
+                    ["pdflatex", "-interaction=nonstopmode", "resume.tex"],
+                    cwd=workspace,
+                    stdin=subprocess.DEVNULL,
+                    text=True
+                )
+            except subprocess.TimeoutExpired:
+                print(f"pdflatex timed out after {compile_timeout()} seconds")
+                return None
+            
+            # Check if pdflatex succeeded
+            if result.returncode != 0:
+                print(f"pdflatex failed with return code {result.returncode}")
+                print(f"stderr: {result.stderr}")
+                print(f"stdout: {result.stdout}")
+                return None
+
+            # Check if PDF was actually generated
+            generated_pdf_path = os.path.join(workspace, "resume.pdf")
+            if not os.path.exists(generated_pdf_path):
+                print(f"PDF file was not generated at {generated_pdf_path}")
+                return None
+            
+            with open(generated_pdf_path, 'rb') as pdf_file:
+                return pdf_file.read()
 
     except Exception as e:
         print(f"Error during PDF generation: {e}")
-        # Clean up on error
-        cleanup_files = [temp_latex_path, generated_pdf_path]
-        for file_path in cleanup_files:
-            if os.path.exists(file_path):
-                try:
-                    os.remove(file_path)
-                except:
-                    pass
         return None
-    
 
-def compile_experience_to_latex_direct(content, bucket_name, base_template_key="latex_templates/base_template.tex"):
+
+def store_pdf(pdf_bytes, storage, pdf_key):
     """
-    Compile experience data directly to PDF without storing intermediate LaTeX in S3
+    Save PDF bytes to the artifact storage and return their URL, or None on failure
     """
-    folder_path = '/tmp'
-    
-    # Download base template from S3
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION_NAME
-    )
-    
     try:
-        # Get base template
-        s3_object = s3.get_object(Bucket=bucket_name, Key=base_template_key)
-        base_template = s3_object['Body'].read().decode('utf-8')
-        
-        # Generate LaTeX content for experiences
-        new_latex_content = ""
-        for experience in content:
-            # Extract and escape all text fields
-            title = escape_latex(experience.get("title", ""))
-            organisation = escape_latex(experience.get("organisation", ""))
-            location = escape_latex(experience.get("location", ""))
-            start_date = escape_latex(experience.get("start_date", ""))
-            end_date = escape_latex(experience.get("end_date", ""))
-            descriptions = experience.get("descriptions", [])
-            
-            desc_items = ""
-            for desc in descriptions:
-                # Handle both string and dict descriptions
-                if isinstance(desc, dict):
-                    desc_text = desc.get("content", "")
-                else:
-                    desc_text = desc
-                
-                escaped_desc = escape_latex(desc_text)
-                desc_items += f"\\resumeItem{{{escaped_desc}}}\n            "
-
-            new_latex_content += f"""
-        \\resumeSubheading{{{title}}}{{{start_date}--{end_date}}}{{{organisation}}}{{{location}}}
-        \\resumeItemListStart
-            {desc_items}\\resumeItemListEnd
+        with timed_stage("pdf_upload"):
+            return storage.put_pdf(pdf_key, pdf_bytes)
+    except StorageError as e:
+        print(f"Error storing PDF: {e}")
+        return None
 
-        """
-        
-        # Replace the placeholder in the template
-        modified_latex = base_template.replace("% INSERT__EXPERIENCES", new_latex_content)
-        
-        # Generate unique temporary filename
-        unique_id = str(uuid.uuid4())[:8]
-        timestamp = int(time.time())
-        temp_latex_filename = f"resume_{unique_id}.tex"
-        temp_latex_path = os.path.join(folder_path, temp_latex_filename)
-        
-        # Write modified LaTeX to temporary file
-        with open(temp_latex_path, 'w', encoding='utf-8') as temp_file:
-            temp_file.write(modified_latex)
-        
-        # Compile to PDF
-        temp_pdf_filename = f"resume_{unique_id}.pdf"
-        generated_pdf_path = os.path.join(folder_path, temp_pdf_filename)
-        
-        result = subprocess.run(
-            ["pdflatex", "-interaction=nonstopmode", temp_latex_filename],
-            cwd=folder_path,
-            capture_output=True,
-            text=True
-        )
-        
-        if result.returncode != 0 or not os.path.exists(generated_pdf_path):
-            print(f"pdflatex compilation failed")
-            print(f"Return code: {result.returncode}")
-            print(f"stderr: {result.stderr}")
-            print(f"stdout: {result.stdout}")
-            return None
-        
-        # Upload PDF to S3
-        pdf_s3_key = f"media-resume/output/resume-{timestamp}.pdf"
-        with open(generated_pdf_path, 'rb') as pdf_file:
-            s3.put_object(
-                Body=pdf_file,
-                Bucket=bucket_name,
-                Key=pdf_s3_key,
-                ContentType='application/pdf'
-            )
-        
-        # Clean up temporary files
-        cleanup_files = [
-            temp_latex_path,
-            generated_pdf_path,
-            os.path.join(folder_path, f"resume_{unique_id}.aux"),
-            os.path.join(folder_path, f"resume_{unique_id}.log"),
-        ]
-        
-        for file_path in cleanup_files:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-        
-        return f"https://{bucket_name}.s3.amazonaws.com/{pdf_s3_key}"
-        
+
+def upload_pdf(pdf_bytes, bucket_name, pdf_s3_key):
+    """
+    Upload PDF bytes to S3 and return the public URL, or None on failure
+    """
+    return store_pdf(pdf_bytes, S3Storage(bucket_name), pdf_s3_key)
+
+
+def compile_latex_source(latex_content, bucket_name, folder, pdf_name, output_folder="media-resume/output"):
+    """
+    Compile LaTeX source held in memory to PDF, upload the PDF to S3 and return its URL
+    """
+    pdf_bytes = compile_latex_to_pdf(latex_content, folder)
+    if pdf_bytes is None:
+        return None
+    return upload_pdf(pdf_bytes, bucket_name, f"{output_folder}/{pdf_name}.pdf")
+
+
+def compile_latex_to_s3(bucket_name, latex_key, folder, output_folder="media-resume/output"):
+    """
+    Download LaTeX file from S3, compile to PDF, upload PDF back to S3
+    """
+    s3 = get_s3_client()
+    try:
+        with timed_stage("tex_download"):
+            s3_object = s3.get_object(Bucket=bucket_name, Key=latex_key)
+            latex_content = s3_object['Body'].read().decode('utf-8')
     except Exception as e:
-        print(f"Error in compile_experience_to_latex_direct: {e}")
+        print(f"Error downloading LaTeX from S3: {e}")
         return None
 
+    original_filename = os.path.splitext(os.path.basename(latex_key))[0]
+    timestamp = int(time.time())
+    return compile_latex_source(latex_content, bucket_name, folder, f"{original_filename}-{timestamp}", output_folder)
+
 
-def compile_latex_block_to_file_s3(bucket_name, latex_key, updated_latex_key, data_latex):
+def archive_latex_source(latex_content, storage, latex_key):
     """
-    Download LaTeX from S3, replace multiple markers, upload modified version back to S3
+    Save rendered LaTeX to the artifact storage for record keeping, never raises
     """
-    s3 = boto3.client(
-        's3',
-        aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
-        region_name=settings.AWS_S3_REGION_NAME
-    )
     try:
-        s3_object = s3.get_object(Bucket=bucket_name, Key=latex_key)
-        content = s3_object['Body'].read().decode('utf-8')
-        
-        # Replace each marker with its corresponding LaTeX content
-        modified_content = content
-        for marker, latex in data_latex.items():
-            if latex.strip():
-                print("replacing:", latex)
-                modified_content = modified_content.replace(marker, latex)
-        
-        # Upload the modified LaTeX file back to S3
-        s3.put_object(
-            Body=modified_content, 
-            Bucket=bucket_name, 
-            Key=updated_latex_key,
-            ContentType='application/x-tex'
-        )
-        return True
-        
-    except NoCredentialsError:
-        print("Credentials not available")
-        return False
+        with timed_stage("tex_upload"):
+            storage.put_tex(latex_key, latex_content)
     except Exception as e:
-        print(f"An error occurred: {e}")
-        return False
+        print(f"Could not archive {latex_key}: {e}")
 
 
-def compile_data_to_latex(content, bucket_name):
+def run_in_background(func, *args, **kwargs):
     """
-    Compile all resume sections to PDF - Fixed version with proper escaping
+    Run work that should not hold up the response (archiving, uploads) on a shared thread pool
     """
-    latex_key = "latex_templates/base_template.tex"
-    updated_latex_key = "latex_templates/updated_template.tex"
-    folder_path = '/tmp'
+    return _background_executor.submit(func, *args, **kwargs)
+    
 
-    # Generate experiences section
-    new_experiences_latex = ""
-    for experience in content["experiences"]:
-        print("experience here", experience)
-        if experience["included"]:
-            title = escape_latex(experience.get("title", ""))
-            organisation = escape_latex(experience.get("organisation", ""))
-            location = escape_latex(experience.get("location", ""))
-            start_date = escape_latex(experience.get("start_date", ""))
-            end_date = escape_latex(experience.get("end_date", ""))
-            descriptions = experience.get("descriptions", [])
-            
-            temp = ""
-            for desc in descriptions:
-                # Handle both string and dict descriptions
-                if isinstance(desc, dict):
-                    desc_content = desc.get("content", "")
-                else:
-                    desc_content = desc
-                
-                escaped_desc = escape_latex(desc_content)
-                temp += f"\\resumeItem{{{escaped_desc}}}\n            "
-
-            new_experiences_latex += f"""
+def _row_version(row, fields):
+    # the values a block is rendered from; a row whose values match reuses its cached block
+    return tuple(row.get(field) for field in fields) + (tuple(description_texts(row.get("descriptions", []))),)
+
+
+EXPERIENCE_FIELDS = ("title", "organisation", "location", "start_date", "end_date")
+PROJECT_FIELDS = ("name", "tools", "source_code")
+EDUCATION_FIELDS = ("school", "major", "location", "start_date", "end_date")
+
+
+def build_experience_block(experience):
+    title = escape_latex(experience.get("title", ""))
+    organisation = escape_latex(experience.get("organisation", ""))
+    location = escape_latex(experience.get("location", ""))
+    start_date = escape_latex(experience.get("start_date", ""))
+    end_date = escape_latex(experience.get("end_date", ""))
+    descriptions = experience.get("descriptions", [])
+    items = "".join([f"\\resumeItem{{{escaped_desc}}}\n            " for escaped_desc in escape_latex_many(description_texts(descriptions))])
+
+    return f"""
             \\resumeSubheading{{{title}}}{{{start_date}--{end_date}}}{{{organisation}}}{{{location}}}
             \\resumeItemListStart
-                {temp}\\resumeItemListEnd
+                {items}\\resumeItemListEnd
 
             """
-    if new_experiences_latex:
-        new_experiences_latex = f"""
+
+
+def build_experiences_latex(experiences):
+    """
+    LaTeX for the included experiences, wrapped in a subheading list (empty if none are included)
+    """
+    blocks = [
+        fragment_cache.render(EXPERIENCE, experience.get("id"), _row_version(experience, EXPERIENCE_FIELDS),
+                              lambda experience=experience: build_experience_block(experience))
+        for experience in experiences if experience["included"]
+    ]
+    if not blocks:
+        return ""
+    return f"""
         \\resumeSubHeadingListStart
-        {new_experiences_latex}
+        {"".join(blocks)}
         \\resumeSubHeadingListEnd
         """
 
-    # Generate education section
-    new_education_latex = ""
-    for education in content["education"]:
-        school = escape_latex(education.get("school", ""))
-        major = escape_latex(education.get("major", ""))
-        location = escape_latex(education.get("location", ""))
-        start_date = escape_latex(education.get("start_date", ""))
-        end_date = escape_latex(education.get("end_date", ""))
-        gpa = escape_latex(education.get("gpa", ""))
-
-        new_education_latex += f"""
+
+def build_education_block(education):
+    school = escape_latex(education.get("school", ""))
+    major = escape_latex(education.get("major", ""))
+    location = escape_latex(education.get("location", ""))
+    start_date = escape_latex(education.get("start_date", ""))
+    end_date = escape_latex(education.get("end_date", ""))
+
+    return f"""
         \\resumeSubheading{{{school}}}{{{location}}}{{{major}}}{{{start_date}--{end_date}}}
 
         """
 
-    # Generate projects section
-    new_projects_latex = ""
-    for project in content["projects"]:
-        if project["included"]:
-            name = escape_latex(project.get("name", ""))
-            tools = escape_latex(project.get("tools", ""))
-            source_code = project.get("source_code", "")  # URLs don't need escaping
-            descriptions = project.get("descriptions", [])
-            
-            temp = ""
-            for desc in descriptions:
-                # Handle both string and dict descriptions
-                if isinstance(desc, dict):
-                    desc_content = desc.get("content", "")
-                else:
-                    desc_content = desc
-                
-                escaped_desc = escape_latex(desc_content)
-                temp += f"\\resumeItem{{{escaped_desc}}}\n            "
-
-            new_projects_latex += f"""
+
+def build_education_latex(education_list):
+    """
+    LaTeX for every education entry
+    """
+    return "".join([
+        fragment_cache.render(EDUCATION, education.get("id"), _row_version(education, EDUCATION_FIELDS),
+                              lambda education=education: build_education_block(education))
+        for education in education_list
+    ])
+
+
+def build_project_block(project):
+    name = escape_latex(project.get("name", ""))
+    tools = escape_latex(project.get("tools", ""))
+    source_code = project.get("source_code", "")  # URLs don't need escaping
+    descriptions = project.get("descriptions", [])
+    items = "".join([f"\\resumeItem{{{escaped_desc}}}\n            " for escaped_desc in escape_latex_many(description_texts(descriptions))])
+
+    return f"""
             \\resumeProjectHeading{{\\textbf{{{name}}} $|$ \\emph{{{tools}}}}}{{\\href{{{source_code}}}{{\\underline{{Source Code}}}}}}
             \\resumeItemListStart
-                {temp}\\resumeItemListEnd
+                {items}\\resumeItemListEnd
             
             """
-    if new_projects_latex:
-        new_projects_latex = f"""
+
+
+def build_projects_latex(projects):
+    """
+    LaTeX for the included projects, wrapped in a subheading list (empty if none are included)
+    """
+    blocks = [
+        fragment_cache.render(PROJECT, project.get("id"), _row_version(project, PROJECT_FIELDS),
+                              lambda project=project: build_project_block(project))
+        for project in projects if project["included"]
+    ]
+    if not blocks:
+        return ""
+    return f"""
         \\resumeSubHeadingListStart
-        {new_projects_latex}
+        {"".join(blocks)}
         \\resumeSubHeadingListEnd
         """
-    
-    temp = ""
-    for skill in content["skills"]:
-        temp += f"{skill["content"]}, "
-    temp = temp[:-2]
 
-    new_skills_latex = f"""
-    \item{{{temp}}}
+
+def build_skills_latex(skills):
+    """
+    LaTeX for the skills line
+    """
+    skills_text = ", ".join([skill["content"] for skill in skills])
+    return f"""
+    \\item{{{skills_text}}}
     
     """
 
-    personal_info = content["personal_info"]
+
+def build_personal_info_latex(personal_info):
+    """
+    LaTeX for the heading: name, number, email and optional portfolio/LinkedIn/GitHub links
+    """
     personal_portfolio = personal_info.get("portfolio", "")
     personal_linkedin = personal_info.get("linkedin", "")
     personal_github = personal_info.get("github", "")
 
-    new_personal_info_latex = f"""
+    parts = [f"""
     \\textbf{{\\Huge \\scshape {personal_info['name']}}} \\\\ \\vspace{{1pt}}
     \\small {personal_info['number']} $|$ \\href{{{personal_info['email']}}}{{\\underline{{{personal_info['email']}}}}} $|$
-    """
+    """]
     if personal_portfolio:
-        new_personal_info_latex += f"\\href{{{personal_portfolio}}}{{\\underline{{Portfolio}}}} $|$ "
+        parts.append(f"\\href{{{personal_portfolio}}}{{\\underline{{Portfolio}}}} $|$ ")
     else:
-        new_personal_info_latex += f"\\href{{}}{{}}"
+        parts.append("\\href{}{}")
     if personal_linkedin:
-        new_personal_info_latex += f"\\href{{{personal_linkedin}}}{{\\underline{{LinkedIn}}}} $|$ "
+        parts.append(f"\\href{{{personal_linkedin}}}{{\\underline{{LinkedIn}}}} $|$ ")
     else:
-        new_personal_info_latex += f"\\href{{}}{{}}"
+        parts.append("\\href{}{}")
     if personal_github:
-        new_personal_info_latex += f"\\href{{{personal_github}}}{{\\underline{{Github}}}}"
+        parts.append(f"\\href{{{personal_github}}}{{\\underline{{Github}}}}")
     else:
-        new_personal_info_latex += f"\\href{{}}{{}}"
-
+        parts.append("\\href{}{}")
+    return "".join(parts)
 
 
-    # Prepare all LaTeX sections for replacement
-    new_data_latex = {
-        "% INSERT_PERSONAL_INFO": new_personal_info_latex,
-        "% INSERT_EXPERIENCES": new_experiences_latex,
-        "% INSERT_EDUCATION": new_education_latex,
-        "% INSERT_PROJECTS": new_projects_latex,
-        "% INSERT_SKILLS": new_skills_latex,
+def build_resume_sections(content):
+    """
+    Build the LaTeX for every template marker from the resume content
+    """
+    return {
+        PERSONAL_INFO_MARKER: build_personal_info_latex(content["personal_info"]),
+        EXPERIENCES_MARKER: build_experiences_latex(content["experiences"]),
+        EDUCATION_MARKER: build_education_latex(content["education"]),
+        PROJECTS_MARKER: build_projects_latex(content["projects"]),
+        SKILLS_MARKER: build_skills_latex(content["skills"]),
     }
 
+
+UPLOAD_SYNC = "sync"
+UPLOAD_BACKGROUND = "background"
+UPLOAD_SKIP = "skip"
+
+
+def render_resume_latex(content, storage=None):
+    """
+    Fill the base template with every resume section.
+    Returns (latex_content, template_version), or None when the template can't be loaded
+    """
+    storage = storage or get_storage()
+    with timed_stage("sections"):
+        new_data_latex = build_resume_sections(content)
+
     print("Generated LaTeX sections:")
     for key, value in new_data_latex.items():
         print(f"{key}: {len(value)} characters")
     
-    # Replace the blocks in LaTeX template stored on S3
-    if not compile_latex_block_to_file_s3(bucket_name, latex_key, updated_latex_key, new_data_latex):
+    # Fill the template in memory and hand the source straight to pdflatex
+    try:
+        with timed_stage("template_get"):
+            template = template_cache.get(storage, BASE_TEMPLATE_KEY)
+        with timed_stage("template_fill"):
+            latex_content = template.parsed.render(new_data_latex)
+    except Exception as e:
+        print(f"Could not fill base template: {e}")
         return None
 
-    # Generate PDF from updated LaTeX file stored in S3 and upload to S3
-    pdf_url = compile_latex_to_s3(bucket_name, updated_latex_key, folder_path)
-    
-    return pdf_url
\ No newline at end of file
+    if getattr(settings, "RESUME_ARCHIVE_TEX", False):
+        # every render gets its own name, so parallel renders never share a key
+        render_name = f"resume-{int(time.time())}-{uuid.uuid4().hex[:8]}"
+        run_in_background(archive_latex_source, latex_content, storage, f"latex_templates/renders/{render_name}.tex")
+
+    return latex_content, template.etag
+
+
+def resume_pdf_key(digest):
+    return f"media-resume/output/resume-{digest}.pdf"
+
+
+def ensure_uploaded(pdf_bytes, storage, pdf_key):
+    """
+    Store the PDF unless the storage already has it, and return its URL (None if storing failed)
+    """
+    if pdf_cache.exists_remote(storage, pdf_key):
+        return storage.url(pdf_key)
+    return store_pdf(pdf_bytes, storage, pdf_key)
+
+
+def render_resume_pdf(content, storage=None, upload=UPLOAD_SYNC):
+    """
+    Render the resume and return (pdf_bytes, url), or None on failure.
+
+    upload decides how the PDF gets to the artifact storage: UPLOAD_SYNC waits for it,
+    UPLOAD_BACKGROUND hands it to the background pool and returns the URL it will have,
+    UPLOAD_SKIP keeps it in the local PDF cache only (url is None). With UPLOAD_SYNC a PDF
+    some other worker already stored is not downloaded again, so pdf_bytes can be None
+    """
+    storage = storage or get_storage()
+    rendered = render_resume_latex(content, storage)
+    if rendered is None:
+        return None
+    latex_content, template_version = rendered
+
+    # identical source + template version means an identical PDF, so skip pdflatex when we have one
+    use_cache = getattr(settings, "RESUME_PDF_CACHE_ENABLED", True)
+    digest = pdf_cache.digest(latex_content, template_version)
+    pdf_key = resume_pdf_key(digest)
+    url = storage.url(pdf_key) if upload != UPLOAD_SKIP else None
+
+    pdf_bytes = pdf_cache.get_local(digest) if use_cache else None
+    if pdf_bytes is not None:
+        print("pdf cache hit")
+        # a streamed render may have kept this PDF local only, so the storage is checked before trusting the URL
+        if upload == UPLOAD_SYNC and ensure_uploaded(pdf_bytes, storage, pdf_key) is None:
+            return None
+        if upload == UPLOAD_BACKGROUND:
+            run_in_background(ensure_uploaded, pdf_bytes, storage, pdf_key)
+        return pdf_bytes, url
+
+    if upload == UPLOAD_SYNC and use_cache and pdf_cache.exists_remote(storage, pdf_key):
+        print("pdf cache hit")
+        return None, url
+
+    pdf_bytes = compile_latex_to_pdf(latex_content)
+    if pdf_bytes is None:
+        return None
+    if upload == UPLOAD_SYNC and store_pdf(pdf_bytes, storage, pdf_key) is None:
+        return None
+    if upload == UPLOAD_BACKGROUND:
+        run_in_background(store_pdf, pdf_bytes, storage, pdf_key)
+    if use_cache:
+        pdf_cache.put_local(digest, pdf_bytes)
+    return pdf_bytes, url
+
+
+def compile_data_to_latex(content, storage=None):
+    """
+    Compile all resume sections to PDF, save it to the artifact storage and return its URL
+    """
+    rendered = render_resume_pdf(content, storage, upload=UPLOAD_SYNC)
+    if rendered is None:
+        return None
+    return rendered[1]
@@ -1,10 +1,142 @@
-from django.shortcuts import render
+from django.conf import settings
+from django.shortcuts import render, get_object_or_404
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect
 from rest_framework.response import Response
 from rest_framework import status, viewsets
 from .utils import *
+from .jobs import submit_render_job, RenderQueueFull
+from .assembly import load_resume_content
+from .draft import render_draft_pdf
+from .workspace import CompileRejected
+from .timing import stage_metrics
+from .response_cache import response_cache
+from .fragments import fragment_cache
+from .s3 import s3_pool_stats
+from .storage import LocalStorage, StorageError, get_storage
+from .models import RenderJob
+from .api.serializers import RenderJobSerializer
+
+def retry_later(message, status_code, retry_after=None):
+    response = Response({"error": message}, status=status_code)
+    response["Retry-After"] = str(retry_after or getattr(settings, "RESUME_COMPILE_RETRY_AFTER", 5))
+    return response
 
 class CreateResumeViewSet(viewsets.ViewSet):
     def create_resume(self, request):
         print("creating resume")
-        compile_data_to_latex(request.data, "jake-resume-for-me")
-        return Response({"message": "Created resume successfully."}, status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
+        content = request.data
+        if not isinstance(content, dict):
+            return Response({"error": "Expected a JSON object."}, status=status.HTTP_400_BAD_REQUEST)
+        # ?source=db builds the sections from the database, the client only sends personal info
+        if request.query_params.get("source") == "db":
+            personal_info = content.get("personal_info") or {}
+            if not isinstance(personal_info, dict):
+                return Response({"error": "personal_info must be an object."}, status=status.HTTP_400_BAD_REQUEST)
+            content = load_resume_content(personal_info)
+
+        # ?mode=async queues the render and returns a job to poll instead of holding this worker
+        if request.query_params.get("mode") == "async":
+            try:
+                job = submit_render_job(content)
+            except RenderQueueFull:
+                return retry_later("Render queue is full, try again shortly.", status.HTTP_503_SERVICE_UNAVAILABLE)
+            return Response(RenderJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+        # ?mode=draft is an instant approximate preview laid out in Python, nothing is compiled or stored
+        if request.query_params.get("mode") == "draft":
+            response = HttpResponse(render_draft_pdf(content), content_type="application/pdf")
+            response["Content-Disposition"] = 'inline; filename="resume-draft.pdf"'
+            return response
+
+        try:
+            # ?mode=stream answers with the PDF itself, the storage gets its copy in the background (?upload=skip keeps it local)
+            if request.query_params.get("mode") == "stream":
+                upload = UPLOAD_SKIP if request.query_params.get("upload") == "skip" else UPLOAD_BACKGROUND
+                rendered = render_resume_pdf(content, upload=upload)
+                if rendered is None:
+                    return Response({"error": "Could not render resume."}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+                pdf_bytes, url = rendered
+                response = HttpResponse(pdf_bytes, content_type="application/pdf")
+                response["Content-Disposition"] = 'inline; filename="resume.pdf"'
+                if url:
+                    response["X-Resume-Url"] = url
+                return response
+
+            compile_data_to_latex(content)
+            return Response({"message": "Created resume successfully."}, status=status.HTTP_204_NO_CONTENT)
+        except CompileRejected as e:
+            # compile queue is full (429) or the wait for a slot ran out (503)
+            return retry_later(str(e), e.status_code, e.retry_after)
+
+class RenderJobViewSet(viewsets.ViewSet):
+    def retrieve(self, request, pk=None):
+        job = get_object_or_404(RenderJob, pk=pk)
+        return Response(RenderJobSerializer(job).data)
+
+    def pdf(self, request, pk=None):
+        job = get_object_or_404(RenderJob, pk=pk)
+        if job.status == RenderJob.SUCCEEDED:
+            # memory:// URLs (MemoryStorage) can't be redirected to, hand them back instead.
+            # S3 URLs and LocalStorage's relative /resume-files/... ones are redirected
+            if job.pdf_url.startswith("memory://"):
+                return Response({"pdf_url": job.pdf_url})
+            return HttpResponseRedirect(job.pdf_url)
+        if job.status == RenderJob.FAILED:
+            return Response({"error": job.error}, status=status.HTTP_410_GONE)
+        return Response(RenderJobSerializer(job).data, status=status.HTTP_409_CONFLICT)
+
+def local_pdf(request, path):
+    """
+    Stream a PDF written by LocalStorage. Fine for a single node, in production let the
+    front-end server (nginx, ...) serve RESUME_LOCAL_STORAGE_DIR at RESUME_LOCAL_STORAGE_URL
+    """
+    storage = get_storage()
+    if not isinstance(storage, LocalStorage):
+        raise Http404()
+    try:
+        return FileResponse(open(storage.path(path), "rb"), content_type="application/pdf")
+    except (StorageError, OSError):
+        raise Http404()
+
+def metrics(request):
+    """
+    Render stage timings and cache counters in the Prometheus text format
+    """
+    if not getattr(settings, "RESUME_METRICS_ENABLED", True):
+        raise Http404()
+
+    cache_stats = response_cache.stats()
+    lines = stage_metrics.prometheus_lines() + [
+        "# HELP resume_response_cache_requests_total Cached list responses served (hit) or rendered (miss).",
+        "# TYPE resume_response_cache_requests_total counter",
+        f'resume_response_cache_requests_total{{result="hit"}} {cache_stats["hits"]}',
+        f'resume_response_cache_requests_total{{result="miss"}} {cache_stats["misses"]}',
+        "# HELP resume_fragment_cache_requests_total LaTeX blocks reused (hit) or rendered again (miss).",
+        "# TYPE resume_fragment_cache_requests_total counter",
+        f'resume_fragment_cache_requests_total{{result="hit"}} {fragment_cache.hits}',
+        f'resume_fragment_cache_requests_total{{result="miss"}} {fragment_cache.misses}',
+    ]
+
+    s3_stats = s3_pool_stats()
+    lines += [
+        "# HELP resume_s3_clients_created_total S3 clients built (one per process unless settings change).",
+        "# TYPE resume_s3_clients_created_total counter",
+        f"resume_s3_clients_created_total {s3_stats['clients_created']}",
+        "# HELP resume_s3_client_reuses_total Calls served by the already built S3 client.",
+        "# TYPE resume_s3_client_reuses_total counter",
+        f"resume_s3_client_reuses_total {s3_stats['client_reuses']}",
+        "# HELP resume_s3_http_requests_total HTTP requests sent to S3.",
+        "# TYPE resume_s3_http_requests_total counter",
+        f"resume_s3_http_requests_total {s3_stats['http_requests']}",
+    ]
+    if s3_stats["connections_opened"] is not None:
+        # only available while botocore's pool internals look the way s3._connections_opened expects
+        lines += [
+            "# HELP resume_s3_connections_opened_total TCP connections opened for the S3 client.",
+            "# TYPE resume_s3_connections_opened_total counter",
+            f"resume_s3_connections_opened_total {s3_stats['connections_opened']}",
+            "# HELP resume_s3_connection_reuses_total S3 requests that went over an already open connection.",
+            "# TYPE resume_s3_connection_reuses_total counter",
+            f"resume_s3_connection_reuses_total {s3_stats['connection_reuses']}",
+        ]
+    return HttpResponse("\n".join(lines) + "\n", content_type="text/plain; version=0.0.4; charset=utf-8")
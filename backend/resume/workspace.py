@@ -0,0 +1,157 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from .timing import record
+
+# tmpfs mount on Linux; compiles write several small files that never need to reach a disk
+RAM_DISK = "/dev/shm"
+STALE_WORKSPACE_AGE = 60 * 60
+COMPILE_PREFIX = "compile-"
+# followed by the owning process's pid, see latex_engine._WarmProcess
+WARM_PREFIX = "warm-"
+
+_lock = threading.Lock()
+_semaphore = None
+_waiting = 0
+_swept_roots = set()
+
+
+class CompileRejected(Exception):
+    """
+    No compile slot could be had. retry_after is a hint in seconds for the client
+    """
+    status_code = 503
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CompileQueueFull(CompileRejected):
+    status_code = 429
+
+
+class CompileQueueTimeout(CompileRejected):
+    status_code = 503
+
+
+def compile_root():
+    """
+    Directory that holds one sub-directory per running compile
+    """
+    root = getattr(settings, "RESUME_COMPILE_WORKSPACE_ROOT", None)
+    if not root:
+        base = RAM_DISK if os.path.isdir(RAM_DISK) and os.access(RAM_DISK, os.W_OK) else tempfile.gettempdir()
+        root = os.path.join(base, "resume-compile")
+    os.makedirs(root, exist_ok=True)
+    _sweep_once(root)
+    return root
+
+
+def _owner_alive(name):
+    try:
+        pid = int(name[len(WARM_PREFIX):].split("-", 1)[0])
+        os.kill(pid, 0)
+    except (ValueError, ProcessLookupError):
+        return False
+    except PermissionError:
+        # exists, but belongs to someone else
+        return True
+    return True
+
+
+def _stale(entry, cutoff):
+    if not entry.is_dir(follow_symlinks=False) or entry.stat().st_mtime >= cutoff:
+        return False
+    if entry.name.startswith(COMPILE_PREFIX):
+        return True
+    # an idle pdflatex of a live worker can sit in its warm-* directory for hours, only sweep dead owners'
+    return entry.name.startswith(WARM_PREFIX) and not _owner_alive(entry.name)
+
+
+def _sweep_once(root):
+    # compile workspaces are always removed afterwards, so an old one was left by a crashed process
+    with _lock:
+        if root in _swept_roots:
+            return
+        _swept_roots.add(root)
+
+    cutoff = time.time() - STALE_WORKSPACE_AGE
+    for entry in os.scandir(root):
+        try:
+            if _stale(entry, cutoff):
+                shutil.rmtree(entry.path, ignore_errors=True)
+        except FileNotFoundError:
+            pass
+
+
+def max_concurrent_compiles():
+    return getattr(settings, "RESUME_MAX_CONCURRENT_COMPILES", None) or os.cpu_count() or 1
+
+
+def _get_semaphore():
+    global _semaphore
+    with _lock:
+        if _semaphore is None:
+            _semaphore = threading.BoundedSemaphore(max_concurrent_compiles())
+        return _semaphore
+
+
+@contextmanager
+def compile_slot():
+    """
+    Hold one of the RESUME_MAX_CONCURRENT_COMPILES slots while pdflatex runs.
+
+    Up to RESUME_COMPILE_QUEUE_SIZE callers may wait for a slot, for at most
+    RESUME_COMPILE_QUEUE_TIMEOUT seconds. Anyone beyond that is turned away straight
+    away with CompileQueueFull, and a caller whose wait runs out gets CompileQueueTimeout,
+    so a burst sheds load instead of piling up workers behind pdflatex
+    """
+    global _waiting
+    semaphore = _get_semaphore()
+    retry_after = getattr(settings, "RESUME_COMPILE_RETRY_AFTER", 5)
+    started = time.perf_counter()
+    if not semaphore.acquire(blocking=False):
+        with _lock:
+            if _waiting >= getattr(settings, "RESUME_COMPILE_QUEUE_SIZE", 16):
+                raise CompileQueueFull("Too many resumes are being compiled, try again shortly.", retry_after)
+            _waiting += 1
+        try:
+            acquired = semaphore.acquire(timeout=getattr(settings, "RESUME_COMPILE_QUEUE_TIMEOUT", 10))
+        finally:
+            with _lock:
+                _waiting -= 1
+        if not acquired:
+            raise CompileQueueTimeout("Timed out waiting for a compile slot, try again shortly.", retry_after)
+    record("compile_queue", time.perf_counter() - started)
+    try:
+        yield
+    finally:
+        semaphore.release()
+
+
+def make_workspace(prefix=COMPILE_PREFIX, parent=None):
+    """
+    Create a private directory for one compile. The caller must remove it with remove_workspace
+    """
+    return tempfile.mkdtemp(prefix=prefix, dir=parent or compile_root())
+
+
+def remove_workspace(path):
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def compile_workspace(parent=None):
+    """
+    Yield a fresh directory for one compile and delete the whole directory afterwards
+    """
+    path = make_workspace(parent=parent)
+    try:
+        yield path
+    finally:
+        remove_workspace(path)
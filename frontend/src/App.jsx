@@ -14,10 +14,7 @@ pdfjs.GlobalWorkerOptions.workerSrc = new URL(
 ).toString();
 
 const VITE_API_URL = import.meta.env.VITE_API_URL
-const EDUCATION_ENDPOINT = `${VITE_API_URL}/education/`
-const EXPERIENCES_ENDPOINT = `${VITE_API_URL}/experiences/`
-const PROJECTS_ENDPOINT = `${VITE_API_URL}/projects/`
-const SKILLS_ENDPOINT = `${VITE_API_URL}/skills/`
+const RESUME_DATA_ENDPOINT = `${VITE_API_URL}/resume-data/`
 
 function App() {
   const [educationData, setEducationData] = useState([]);
@@ -25,48 +22,20 @@ function App() {
   const [projectsData, setProjectsData] = useState([]);
   const [skillsData, setSkillsData] = useState([]);
 
-  async function fetchData(dataType) {
-    let response = null;
-    let fetchedData = null;
-
+  // one request returns every section, instead of four sequential list fetches
+  async function fetchAllData() {
     try {
-      switch (dataType) {
-        case "education":
-          response = await axios.get(EDUCATION_ENDPOINT);
-          fetchedData = response.data;
-          setEducationData(fetchedData);
-          break;
-        case "experiences":
-          response = await axios.get(EXPERIENCES_ENDPOINT);
-          fetchedData = response.data;
-          setExperiencesData(fetchedData);
-          break;
-        case "projects":
-          response = await axios.get(PROJECTS_ENDPOINT);
-          fetchedData = response.data;
-          setProjectsData(fetchedData);
-          break;
-        case "skills":
-          response = await axios.get(SKILLS_ENDPOINT);
-          fetchedData = response.data;
-          setSkillsData(fetchedData);
-          break;
-        default:
-          console.log("Invalid data type provided.");
-          return;
-      }
+      const response = await axios.get(RESUME_DATA_ENDPOINT);
+      const { education, experiences, projects, skills } = response.data;
+      setEducationData(education);
+      setExperiencesData(experiences);
+      setProjectsData(projects);
+      setSkillsData(skills);
     } catch (error) {
-      console.error(`Failed to fetch ${dataType} data:`, error);
+      console.error("Failed to fetch resume data:", error);
     }
   }
 
-  async function fetchAllData() {
-    await fetchData("education");
-    await fetchData("experiences");
-    await fetchData("projects");
-    await fetchData("skills");
-  }
-
   useEffect(() => {
     fetchAllData();
   }, []);
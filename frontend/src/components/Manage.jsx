@@ -326,21 +326,17 @@ const Manage = ({ educationData, experiencesData, projectsData, skillsData }) =>
 
   const includeExclude = async (item) => {
     try {
+      // bulk endpoint only touches the included flag, descriptions are left alone
+      const included = !(item.included)
+      const body = [{id: item.id, included}]
+      const config = {
+        headers: {
+          'Content-Type': 'application/json'
+        }
+      };
+
       if (activeSection == "projects") {
-        const name = item.name
-        const tools = item.tools
-        const source_code = item.source_code
-        const descriptions = item.descriptions.map(desc => ({content: desc.content}));
-        const included = !(item.included)
-
-        const body = {name, tools, source_code, descriptions, included}
-        const config = {
-          headers: {
-            'Content-Type': 'application/json'
-          }
-        };
-        
-        const response = await axios.put(`${PROJECTS_ENDPOINT}${item.id}/`, body, config)
+        const response = await axios.patch(`${PROJECTS_ENDPOINT}bulk/`, body, config)
         console.log(response)
         
         // Update local state immediately after successful backend update
@@ -351,24 +347,7 @@ const Manage = ({ educationData, experiencesData, projectsData, skillsData }) =>
         return response.data
       }
       else if (activeSection == "experiences") {
-        const title = item.title 
-        const organisation = item.organisation 
-        const location = item.location 
-        const start_date = item.start_date
-        const end_date = item.end_date
-        const descriptions = item.descriptions.map(desc => ({content: desc.content}));
-        const included = !(item.included)
-
-        console.log(descriptions)
-
-        const body = {title, organisation, location, start_date, end_date, descriptions, included}
-        const config = {
-          headers: {
-            'Content-Type': 'application/json'
-          }
-        };
-        
-        const response = await axios.put(`${EXPERIENCES_ENDPOINT}${item.id}/`, body, config)
+        const response = await axios.patch(`${EXPERIENCES_ENDPOINT}bulk/`, body, config)
         console.log(response)
         
         // Update local state immediately after successful backend update
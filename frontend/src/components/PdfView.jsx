@@ -11,6 +11,8 @@ const PdfView = ({ educationData, experiencesData, projectsData, skillsData, ref
     const [pageNumber, setPageNumber] = useState(1);
     const containerRef = useRef(null);
     const [containerWidth, setContainerWidth] = useState(0);
+    // the bundled sample until the first resume is rendered
+    const [pdfFile, setPdfFile] = useState(pdfUrl);
 
     const [personalData, setpersonalData] = useState({
         name: '',
@@ -30,25 +32,31 @@ const PdfView = ({ educationData, experiencesData, projectsData, skillsData, ref
         }));
     };
 
-    const createResume = async () => {
-        await refreshData();
-
+    // mode=stream compiles the real resume, mode=draft is an instant approximate layout for previews
+    const createResume = async (mode = 'stream') => {
+        // the server reads education, experiences, projects and skills from the database itself,
+        // so only the personal info has to be sent
         const personal_info = personalData
-        const education = educationData
-        const experiences = experiencesData
-        const projects = projectsData
-        const skills = skillsData
 
-        const body = {personal_info, education, experiences, projects, skills}
+        const body = {personal_info}
         const config = {
         headers: {
             'Content-Type': 'application/json'
-        }
+        },
+        // mode=stream returns the PDF itself, so it can be shown without another download
+        responseType: 'blob'
         };
 
-        const response = await axios.post(CREATE_RESUME_ENDPOINT, body, config)
+        const response = await axios.post(`${CREATE_RESUME_ENDPOINT}?source=db&mode=${mode}`, body, config)
         console.log(response)
-        return response.data
+
+        setPdfFile(previous => {
+            if (previous !== pdfUrl) {
+                URL.revokeObjectURL(previous)
+            }
+            return URL.createObjectURL(response.data)
+        })
+        return response.headers['x-resume-url']
     }
 
     useEffect(() => {
@@ -69,7 +77,7 @@ const PdfView = ({ educationData, experiencesData, projectsData, skillsData, ref
         <div className="w-full flex flex-col items-center gap-4">
             <div ref={containerRef} className="w-full bg-fuchsia-200 rounded-xl overflow-hidden">
                 <Document
-                    file={pdfUrl} 
+                    file={pdfFile} 
                     onLoadSuccess={({ numPages }) => {setNumPages(numPages);}}
                 >
                     <Page 
@@ -81,7 +89,10 @@ const PdfView = ({ educationData, experiencesData, projectsData, skillsData, ref
                 </Document>
             </div>
             <div className="w-full flex flex-row gap-3">
-                <button type="button" onClick={createResume} className="w-full bg-fuchsia-300 text-white py-2 px-4 rounded-md hover:bg-fuchsia-500 transition-colors font-medium">
+                <button type="button" onClick={() => createResume('draft')} className="w-full bg-fuchsia-300 text-white py-2 px-4 rounded-md hover:bg-fuchsia-500 transition-colors font-medium">
+                    Preview Draft
+                </button>
+                <button type="button" onClick={() => createResume()} className="w-full bg-fuchsia-300 text-white py-2 px-4 rounded-md hover:bg-fuchsia-500 transition-colors font-medium">
                     Create Resume
                 </button>
                 <button type="button" className="w-full bg-fuchsia-300 text-white py-2 px-4 rounded-md hover:bg-fuchsia-500 transition-colors font-medium">